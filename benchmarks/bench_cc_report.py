@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - CC報告取得のレイテンシ・メモリベンチマーク
+
+ファイルサイズとセッション数の組み合わせごとに合成ログを作り、
+get_cc_report のレイテンシとピーク RSS を計測して JSON に保存する。
+一時ディレクトリを USERPROFILE / APPDATA に設定するので Linux でも動き、
+実際の設定やインデックスには触れない。
+
+計測する場面:
+    cold     起動直後・インデックスなし（初回の Alt+C）
+    warm     変更なしでもう一度（キャッシュに当たる）
+    append   報告が1件追記された直後
+    restart  再起動直後・インデックスあり
+
+実行方法:
+    python benchmarks/bench_cc_report.py [--sizes 1M,10M,100M] [--sessions 1,100]
+                                         [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src" / "python"
+sys.path.insert(0, str(BENCH_DIR))
+
+from gen_session_logs import SessionLogWriter, parse_size  # noqa: E402
+
+PROJECT_PATH = "C:\\bench\\project"
+PROJECT_HASH = "C--bench-project"
+
+# 古いセッションログ1件あたりのサイズ
+OLD_SESSION_SIZE = 64 * 1024
+
+
+def peak_rss_mb():
+    """このプロセスのピーク RSS（MB）を取得"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux は KB、macOS はバイト単位
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return None
+
+
+def prepare_home(home, size_bytes, sessions, seed=0):
+    """
+    一時ホームに合成ログを作る（最新のセッションだけ size_bytes、残りは小さい古いセッション）
+
+    Returns:
+        Path: 最新のセッションログ
+    """
+    log_dir = home / ".claude" / "projects" / PROJECT_HASH
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    base_time = time.time() - sessions * 60
+    for i in range(sessions - 1):
+        path = log_dir / f"old-{i:05d}.jsonl"
+        SessionLogWriter(path, seed=seed + i + 1).write(OLD_SESSION_SIZE, end_with_report=i % 2 == 0)
+        os.utime(path, (base_time + i * 60, base_time + i * 60))
+
+    latest = log_dir / "latest.jsonl"
+    SessionLogWriter(latest, seed=seed).write(size_bytes)
+    return latest
+
+
+def run_child(phases, home, latest):
+    """別プロセスで計測する（ピーク RSS をシナリオごとに分けるため）"""
+    env = dict(os.environ, USERPROFILE=str(home), APPDATA=str(home / "AppData"))
+    spec = json.dumps({"phases": phases, "home": str(home), "latest": str(latest)})
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", spec],
+        env=env, capture_output=True, text=True, encoding="utf-8", check=True
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def child_main(spec):
+    """子プロセス側：指定された場面を順に計測して JSON を出力"""
+    spec = json.loads(spec)
+    home = Path(spec["home"])
+    sys.path.insert(0, str(SRC_DIR))
+
+    # デバッグ出力で結果の JSON を汚さないよう stderr に逃がす
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+
+    import session_index
+    session_index.INDEX_FILE = home / "session_index.db"
+    import cc_report
+
+    result = {}
+    for phase in spec["phases"]:
+        if phase == "append":
+            writer = SessionLogWriter(spec["latest"], seed=999)
+            with open(spec["latest"], "a", encoding="utf-8", newline="\n") as f:
+                for entry in writer.report_turn(split=2):
+                    f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+        started = time.perf_counter()
+        success, _ = cc_report.get_cc_report(PROJECT_PATH)
+        result[f"{phase}_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        result[f"{phase}_ok"] = success
+
+    result["peak_rss_mb"] = round(peak_rss_mb() or 0, 1)
+    sys.stdout = stdout
+    print(json.dumps(result))
+
+
+def run_scenario(size_bytes, sessions):
+    """1シナリオ分の計測"""
+    home = Path(tempfile.mkdtemp(prefix="bridgiron_bench_"))
+    try:
+        latest = prepare_home(home, size_bytes, sessions)
+        first = run_child(["cold", "warm", "append"], home, latest)
+        second = run_child(["restart"], home, latest)
+        return {
+            "size_bytes": size_bytes,
+            "sessions": sessions,
+            "cold_ms": first["cold_ms"],
+            "warm_ms": first["warm_ms"],
+            "append_ms": first["append_ms"],
+            "restart_ms": second["restart_ms"],
+            "ok": all(first[f"{p}_ok"] for p in ("cold", "warm", "append")) and second["restart_ok"],
+            "peak_rss_mb": max(first["peak_rss_mb"], second["peak_rss_mb"]),
+        }
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+
+def compare(results, baseline_path, threshold, min_delta=1.0):
+    """
+    以前の結果と比べて、threshold（割合）以上かつ min_delta（ms / MB）以上悪化した項目を表示
+
+    Returns:
+        bool: 劣化がなければ True
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    base_map = {(r["size_bytes"], r["sessions"]): r for r in baseline["results"]}
+
+    ok = True
+    for r in results:
+        base = base_map.get((r["size_bytes"], r["sessions"]))
+        if base is None:
+            continue
+        for key in ("cold_ms", "warm_ms", "append_ms", "restart_ms", "peak_rss_mb"):
+            if not base.get(key):
+                continue
+            ratio = r[key] / base[key]
+            mark = ""
+            if ratio > 1 + threshold and r[key] - base[key] > min_delta:
+                mark = "  <-- REGRESSION"
+                ok = False
+            print(f"{r['size_bytes'] // 1024 // 1024:>6} MB x{r['sessions']:<5} {key:<12}"
+                  f"{base[key]:>10.2f} -> {r[key]:>10.2f} ({ratio:5.2f}x){mark}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark get_cc_report latency and peak RSS")
+    parser.add_argument("--sizes", default="1M,10M,100M", help="latest session sizes (e.g. 1M,500M,2G)")
+    parser.add_argument("--sessions", default="1,100", help="session counts per project")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare with a previous results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="regression threshold (0.2 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=1.0,
+                        help="ignore regressions smaller than this many ms / MB")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args.child)
+        return 0
+
+    results = []
+    for size in [parse_size(s) for s in args.sizes.split(",")]:
+        for sessions in [int(n) for n in args.sessions.split(",")]:
+            r = run_scenario(size, sessions)
+            results.append(r)
+            print(f"{size // 1024 // 1024:>6} MB x{sessions:<5} cold {r['cold_ms']:>9.2f} ms  "
+                  f"warm {r['warm_ms']:>7.2f} ms  append {r['append_ms']:>7.2f} ms  "
+                  f"restart {r['restart_ms']:>7.2f} ms  peak {r['peak_rss_mb']:>7.1f} MB"
+                  f"{'' if r['ok'] else '  (no report!)'}")
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Saved: {args.output}")
+
+    if args.compare:
+        return 0 if compare(results, args.compare, args.threshold, args.min_delta) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
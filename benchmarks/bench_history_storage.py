@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - コピー履歴の保存サイズ・メモリ比較
+
+旧形式（全文をそのまま持つ copy_history.json）を、blob 形式（内容ハッシュをキーにした
+圧縮 blob と、キーだけを持つ本体）に移したときの、ディスク上のサイズと読み込み後の
+メモリ使用量・読み込み時間を比較する。--file を指定すると実際の履歴ファイルのコピーで計測する
+（元のファイルには触れない）。指定しなければ、同じ指示の繰り返しと枕文付きの報告を
+含む合成の履歴を使う。
+
+実行方法:
+    python benchmarks/bench_history_storage.py [--file copy_history.json] [--prefix TEXT]
+"""
+
+import argparse
+import gc
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+
+from copy_history import CopyHistory  # noqa: E402
+from settings import DEFAULT_CC_PREFIX  # noqa: E402
+
+# 合成の履歴の件数（カテゴリごと、CopyHistory.MAX_ENTRIES と同じ）
+SYNTHETIC_ENTRIES = 50
+
+
+def write_synthetic_history(path, prefix, seed=0):
+    """
+    旧形式の合成の履歴を書き出す
+
+    GPT→CC は数種類の指示を繰り返しコピーしたもの、CC→GPT は枕文付きの数 KB の報告。
+    """
+    rng = random.Random(seed)
+    words = ("session", "cursor", "report", "offset", "index", "cache", "worker", "history",
+             "実装", "報告", "変更", "テスト", "キャッシュ", "ログ", "差分", "確認")
+
+    def paragraph(n):
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    prompts = [f"## 指示 {i}\n" + "\n".join(f"- {paragraph(12)}" for _ in range(rng.randint(5, 30)))
+               for i in range(8)]
+    now = datetime.now()
+    data = {"gpt_to_cc": [], "cc_to_gpt": []}
+    for i in range(SYNTHETIC_ENTRIES):
+        timestamp = (now - timedelta(minutes=i * 7)).isoformat()
+        content = rng.choice(prompts)
+        data["gpt_to_cc"].append({"timestamp": timestamp, "preview": content[:30].replace("\n", " "),
+                                  "content": content})
+        report = "\n".join(
+            [f"## 実装報告 {i}", paragraph(40), "```python"]
+            + [f"    {paragraph(6)}" for _ in range(rng.randint(20, 120))]
+            + ["```", "## 次のアクション", paragraph(30)]
+        )
+        data["cc_to_gpt"].append({"timestamp": timestamp, "preview": report[:30].replace("\n", " "),
+                                  "content": prefix + report})
+    with open(path, "w", encoding="utf-8-sig") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def disk_bytes(history_file):
+    """本体・ジャーナル・blob のパックの合計バイト数"""
+    total = 0
+    for path in (history_file, history_file.with_name(history_file.name + ".journal")):
+        if path.exists():
+            total += path.stat().st_size
+    pack = history_file.with_suffix(".pack")
+    if pack.exists():
+        total += pack.stat().st_size
+    return total
+
+
+def measure_load(load):
+    """
+    load() の所要時間と、結果を保持したままのメモリ使用量
+
+    Returns:
+        tuple: (ミリ秒, バイト)
+    """
+    gc.collect()
+    started = time.perf_counter()
+    load()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed_ms, current
+
+
+def load_legacy(path):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare copy history storage formats")
+    parser.add_argument("--file", help="an existing copy_history.json in the old format (copied, not modified)")
+    parser.add_argument("--prefix", default=DEFAULT_CC_PREFIX,
+                        help="CC prefix to split off old entries (default: the built-in prefix)")
+    args = parser.parse_args()
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="bridgiron_bench_"))
+    try:
+        legacy_file = tmp_dir / "legacy.json"
+        if args.file:
+            shutil.copyfile(args.file, legacy_file)
+        else:
+            write_synthetic_history(legacy_file, args.prefix)
+
+        legacy_data = load_legacy(legacy_file)
+        if any("content" not in entry for entries in legacy_data.values() if isinstance(entries, list)
+               for entry in entries):
+            print("The file is not in the old format (entries without 'content')")
+            return 1
+        entries = sum(len(v) for v in legacy_data.values() if isinstance(v, list))
+        raw_bytes = sum(len(e["content"].encode("utf-8")) for v in legacy_data.values() if isinstance(v, list)
+                        for e in v)
+        legacy_disk = legacy_file.stat().st_size
+        legacy_ms, legacy_memory = measure_load(lambda: load_legacy(legacy_file))
+        print(f"{entries} entries, {raw_bytes:,} bytes of content")
+        print(f"{'format':<10}{'disk bytes':>14}{'saved':>8}{'memory bytes':>16}{'saved':>8}{'load ms':>10}")
+        print(f"{'legacy':<10}{legacy_disk:>14,}{'':>8}{legacy_memory:>16,}{'':>8}{legacy_ms:>10.2f}")
+
+        for codec in ("zlib", "lzma"):
+            history_file = tmp_dir / codec / "copy_history.json"
+            history_file.parent.mkdir()
+            shutil.copyfile(legacy_file, history_file)
+            # 読み込み時に blob 形式へ移し、close で書き出す
+            CopyHistory(history_file, codec=codec, known_prefixes=(args.prefix,)).close()
+
+            disk = disk_bytes(history_file)
+            elapsed_ms, memory = measure_load(lambda: CopyHistory(history_file, codec=codec))
+            print(f"{codec:<10}{disk:>14,}{(1 - disk / legacy_disk) * 100:>7.0f}%"
+                  f"{memory:>16,}{(1 - memory / legacy_memory) * 100:>7.0f}%{elapsed_ms:>10.2f}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - ログ解析のデコード時間ベンチマーク
+
+合成したセッションログ（既定 500 MB）を全行走査し、
+次の3方式で assistant テキストの抽出にかかる時間を比較する。
+
+  1. 全行を json.loads（従来方式）
+  2. バイト列で絞り込んでから json.loads
+  3. バイト列で絞り込んでから orjson.loads（インストールされている場合のみ）
+
+実行方法: python benchmarks/bench_log_decode.py [--size-mb 500] [--keep]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+
+import cc_report  # noqa: E402
+from io_utils import iter_lines_from  # noqa: E402
+
+
+def write_synthetic_log(path, size_bytes, seed=0):
+    """
+    assistant / user / tool_use / tool_result が混在した合成ログを書き出す
+
+    Args:
+        path: 出力先
+        size_bytes: おおよそのファイルサイズ
+        seed: 乱数シード
+    """
+    rng = random.Random(seed)
+    filler = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz 日本語\n") for _ in range(4096))
+    written = 0
+    turn = 0
+
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        while written < size_bytes:
+            turn += 1
+            kind = rng.random()
+            if kind < 0.15:
+                entry = {"type": "assistant", "message": {"role": "assistant", "content": [
+                    {"type": "text", "text": f"Turn {turn}: " + filler[:rng.randint(50, 800)]}]}}
+            elif kind < 0.35:
+                entry = {"type": "assistant", "message": {"role": "assistant", "content": [
+                    {"type": "tool_use", "name": "Bash", "input": {"command": "pytest -q"}}]}}
+            else:
+                # 巨大なツール出力
+                output = filler * rng.randint(1, 40)
+                entry = {"type": "user", "message": {"role": "user", "content": [
+                    {"type": "tool_result", "tool_use_id": f"toolu_{turn}", "content": output}]}}
+            line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+            f.write(line)
+            written += len(line.encode("utf-8"))
+
+
+def scan_decode_all(path):
+    """全行をデコードして assistant テキストを数える（従来方式）"""
+    found = 0
+    for _, line, _ in iter_lines_from(path):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if entry.get("type") == "assistant":
+            for item in entry.get("message", {}).get("content", []):
+                if isinstance(item, dict) and item.get("type") == "text":
+                    found += 1
+                    break
+    return found
+
+
+def scan_prefiltered(path):
+    """絞り込み付きの cc_report の行解析で assistant テキストを数える"""
+    found = 0
+    for _, line, _ in iter_lines_from(path):
+        if cc_report._parse_assistant_text(line) is not None:
+            found += 1
+    return found
+
+
+def measure(label, func, path):
+    start = time.perf_counter()
+    found = func(path)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f} s  ({found} texts)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark log decoding in cc_report")
+    parser.add_argument("--size-mb", type=int, default=500, help="synthetic log size in MB")
+    parser.add_argument("--keep", action="store_true", help="keep the generated log file")
+    args = parser.parse_args()
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="bridgiron_bench_"))
+    log_path = tmp_dir / "session.jsonl"
+    print(f"Generating {args.size_mb} MB synthetic log: {log_path}")
+    write_synthetic_log(log_path, args.size_mb * 1024 * 1024)
+
+    try:
+        # ページキャッシュを温めておく
+        for _ in iter_lines_from(log_path):
+            pass
+
+        baseline = measure("json.loads every line", scan_decode_all, log_path)
+
+        cc_report.set_json_decoder(json.loads)
+        filtered = measure("prefilter + json", scan_prefiltered, log_path)
+        print(f"{'':<28} saved {baseline - filtered:.2f} s ({(1 - filtered / baseline) * 100:.0f}%)")
+
+        try:
+            import orjson
+        except ImportError:
+            print("orjson is not installed; skipped prefilter + orjson")
+        else:
+            cc_report.set_json_decoder(orjson.loads)
+            fast = measure("prefilter + orjson", scan_prefiltered, log_path)
+            print(f"{'':<28} saved {baseline - fast:.2f} s ({(1 - fast / baseline) * 100:.0f}%)")
+    finally:
+        if args.keep:
+            print(f"Kept: {log_path}")
+        else:
+            os.remove(log_path)
+            os.rmdir(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
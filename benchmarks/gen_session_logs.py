@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - 合成セッションログ生成
+
+Claude Code の .jsonl セッションログに似せたログを書き出す。
+user プロンプト・assistant テキスト・tool_use・巨大な tool_result・SOR/EOR 報告が混在する。
+
+実行方法:
+    python benchmarks/gen_session_logs.py OUT_DIR --size 100M [--sessions 3] [--seed 0]
+"""
+
+import argparse
+import json
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# サイズ指定の単位
+SIZE_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+_WORDS = (
+    "implement refactor parser session report cursor offset index cache test fix "
+    "ファイル 実装 修正 報告 テスト 確認 完了 対応 設定 履歴"
+).split()
+
+
+def parse_size(text):
+    """'500M' / '2G' / '1048576' 形式のサイズをバイト数に変換"""
+    text = text.strip().upper()
+    if text and text[-1] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+class SessionLogWriter:
+    """1セッション分の合成ログを書き出す"""
+
+    def __init__(self, path, seed=0, session_id=None, start_time=None):
+        self.path = Path(path)
+        self.rng = random.Random(seed)
+        self.session_id = session_id or str(uuid.UUID(int=self.rng.getrandbits(128)))
+        self.clock = start_time or datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.parent_uuid = None
+        self.turn = 0
+        # 巨大なツール出力用の素材（毎回生成すると遅いので使い回す）
+        self.filler = "\n".join(
+            " ".join(self.rng.choice(_WORDS) for _ in range(12)) for _ in range(256)
+        )
+
+    def _words(self, count):
+        return " ".join(self.rng.choice(_WORDS) for _ in range(count))
+
+    def _base(self, entry_type):
+        self.clock += timedelta(milliseconds=self.rng.randint(50, 5000))
+        entry_uuid = str(uuid.UUID(int=self.rng.getrandbits(128)))
+        entry = {
+            "parentUuid": self.parent_uuid,
+            "isSidechain": False,
+            "userType": "external",
+            "cwd": "C:\\work\\project",
+            "sessionId": self.session_id,
+            "version": "1.0.0",
+            "type": entry_type,
+            "uuid": entry_uuid,
+            "timestamp": self.clock.strftime("%Y-%m-%dT%H:%M:%S.") + f"{self.clock.microsecond // 1000:03d}Z",
+        }
+        self.parent_uuid = entry_uuid
+        return entry
+
+    def _assistant(self, content):
+        entry = self._base("assistant")
+        entry["message"] = {
+            "id": f"msg_{self.rng.getrandbits(64):016x}",
+            "type": "message",
+            "role": "assistant",
+            "model": "claude-model",
+            "content": content,
+            "stop_reason": None,
+            "usage": {
+                "input_tokens": self.rng.randint(1, 50),
+                "cache_creation_input_tokens": self.rng.randint(0, 5000),
+                "cache_read_input_tokens": self.rng.randint(0, 80000),
+                "output_tokens": self.rng.randint(1, 2000),
+            },
+        }
+        entry["requestId"] = f"req_{self.rng.getrandbits(64):016x}"
+        return entry
+
+    def user_prompt(self):
+        entry = self._base("user")
+        entry["message"] = {"role": "user", "content": self._words(self.rng.randint(10, 200))}
+        return entry
+
+    def assistant_text(self, text=None):
+        return self._assistant([{"type": "text", "text": text or self._words(self.rng.randint(5, 120))}])
+
+    def tool_use(self):
+        tool_id = f"toolu_{self.rng.getrandbits(64):016x}"
+        entry = self._assistant([{
+            "type": "tool_use", "id": tool_id, "name": self.rng.choice(["Bash", "Read", "Edit", "Grep"]),
+            "input": {"command": self._words(6)},
+        }])
+        return entry, tool_id
+
+    def tool_result(self, tool_id, size):
+        entry = self._base("user")
+        repeat = size // len(self.filler) + 1
+        output = (self.filler * repeat)[:size]
+        entry["message"] = {"role": "user", "content": [
+            {"tool_use_id": tool_id, "type": "tool_result", "content": output, "is_error": False}
+        ]}
+        return entry
+
+    def report_turn(self, split=2):
+        """SOR/EOR 報告を split 件のメッセージに分けて返す"""
+        body = [f"## 実装報告 {self.turn}", self._words(40), "### 変更点", self._words(60), "### 次のアクション",
+                self._words(20)]
+        chunk = max(1, len(body) // split)
+        parts = [body[i:i + chunk] for i in range(0, len(body), chunk)]
+        texts = ["\n".join(part) for part in parts]
+        texts[0] = "---SOR---\n" + texts[0]
+        texts[-1] = texts[-1] + "\n---EOR---"
+        return [self.assistant_text(text) for text in texts]
+
+    def iter_turn(self, max_tool_output):
+        """1往復分（プロンプト → ツール実行 → 報告）のエントリを返す"""
+        self.turn += 1
+        yield self.user_prompt()
+        for _ in range(self.rng.randint(1, 6)):
+            if self.rng.random() < 0.5:
+                yield self.assistant_text()
+            entry, tool_id = self.tool_use()
+            yield entry
+            # ツール出力は小さいものが多く、ときどき巨大なものが混ざる
+            if self.rng.random() < 0.1:
+                size = self.rng.randint(max_tool_output // 4, max_tool_output)
+            else:
+                size = self.rng.randint(100, 8000)
+            yield self.tool_result(tool_id, size)
+        if self.rng.random() < 0.7:
+            yield from self.report_turn(split=self.rng.randint(1, 3))
+        else:
+            yield self.assistant_text()
+
+    def write(self, size_bytes, max_tool_output=2 * 1024 * 1024, end_with_report=True):
+        """
+        おおよそ size_bytes になるまで書き出す
+
+        Args:
+            size_bytes: 目標サイズ
+            max_tool_output: 巨大なツール出力の最大バイト数
+            end_with_report: 最後を SOR/EOR 報告で終えるか
+
+        Returns:
+            int: 書き出したバイト数
+        """
+        written = 0
+        with open(self.path, "w", encoding="utf-8", newline="\n") as f:
+            while written < size_bytes:
+                for entry in self.iter_turn(min(max_tool_output, max(1024, size_bytes // 8))):
+                    line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+                    f.write(line)
+                    written += len(line.encode("utf-8"))
+            if end_with_report:
+                for entry in self.report_turn(split=2):
+                    line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+                    f.write(line)
+                    written += len(line.encode("utf-8"))
+        return written
+
+
+def write_session_log(path, size_bytes, seed=0, **kwargs):
+    """合成セッションログを1つ書き出す（SessionLogWriter.write の簡易版）"""
+    return SessionLogWriter(path, seed=seed).write(size_bytes, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Claude Code session logs")
+    parser.add_argument("out_dir", help="output directory")
+    parser.add_argument("--size", default="10M", help="size per session (e.g. 1M, 500M, 2G)")
+    parser.add_argument("--sessions", type=int, default=1, help="number of session files")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    size = parse_size(args.size)
+    for i in range(args.sessions):
+        session_id = str(uuid.UUID(int=random.Random(args.seed + i).getrandbits(128)))
+        path = out_dir / f"{session_id}.jsonl"
+        written = SessionLogWriter(path, seed=args.seed + i, session_id=session_id).write(size)
+        print(f"{path} {written} bytes")
+
+
+if __name__ == "__main__":
+    main()
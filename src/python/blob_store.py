@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - 内容アドレスの圧縮 blob
+
+履歴の全文を、内容のハッシュをキーにした圧縮レコードとして1つのパックファイルに追記する。
+同じ内容は1回しか保存されない。各レコードは固定長のヘッダ（ハッシュ・圧縮方式・長さ）と
+圧縮した本文からなり、起動時はヘッダだけを飛び飛びに読んでキー → (オフセット, 長さ) を作る。
+本文は get() で1件分だけ seek して読むので、起動時間とメモリは保存した内容の量によらない。
+
+書き込みは flush() でまとめて行い、それまではメモリ上に保留する（保留中でも get() で読める）。
+参照されなくなったレコードは collect_garbage() で外し、無駄な領域が増えたらパックを書き直す。
+
+lock は辞書の出し入れだけに使い、パックへの書き込み・fsync・書き直しは io_lock の下で、
+パックの読み込みと置き換えは file_lock の下で行う。put() はファイル操作を待たずに戻る。
+"""
+
+import hashlib
+import lzma
+import os
+import struct
+import threading
+import zlib
+
+# 圧縮方式 → (ID, 圧縮関数, 展開関数)
+CODECS = {
+    "zlib": (1, lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (2, lambda data: lzma.compress(data, preset=6), lzma.decompress),
+}
+_DECOMPRESSORS = {codec_id: decompress for codec_id, _, decompress in CODECS.values()}
+
+# レコードのヘッダ（SHA-1 の20バイト、圧縮方式の ID、本文のバイト数）
+PACK_HEADER = struct.Struct("<20sBI")
+
+# 使われていない領域がこのバイト数と使用中の領域の両方を超えたらパックを書き直す
+PACK_COMPACT_MIN_BYTES = 256 * 1024
+
+
+def blob_key(text):
+    """内容のキー（UTF-8 の SHA-1 の16進表記）"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class BlobStore:
+    """内容アドレスの圧縮 blob のパックファイル"""
+
+    def __init__(self, pack_path, codec="zlib", read_only=False):
+        """
+        Args:
+            pack_path: パックファイルのパス（なければ最初の flush で作る）
+            codec: 新しく書く blob の圧縮方式（"zlib" / "lzma"）。読み込みはレコードの ID で判別する
+            read_only: True ならパックに書き込まない（壊れた末尾は切り詰めずに無視する）
+        """
+        if codec not in CODECS:
+            raise ValueError(f"unknown blob codec: {codec}")
+        self.path = pack_path
+        self.codec = codec
+        self.read_only = read_only
+        self.lock = threading.Lock()       # pending・stored・バイト数を守る
+        self.io_lock = threading.Lock()    # flush・collect_garbage・書き直しを1つずつにする
+        self.file_lock = threading.Lock()  # get の読み込みと、書き直したパックへの置き換えを分ける
+        self.pending = {}       # キー → 未書き込みの内容
+        self.touched = None     # begin_collection() 以降に put されたキー（収集中でなければ None）
+        self.stored = {}        # キー → (本文のオフセット, 本文のバイト数, 圧縮方式の ID)
+        self.pack_bytes = 0     # パックの有効なバイト数
+        self.dead_bytes = 0     # 参照されなくなったレコードのバイト数
+        self._scan()
+
+    def _scan(self):
+        """
+        パックのヘッダを順にたどってキーの位置を集める（本文は読まない）
+
+        書き込み途中で落ちた末尾のレコードは捨て、パックをその手前で切り詰める。
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+
+        pos = 0
+        with open(self.path, "rb") as f:
+            while pos + PACK_HEADER.size <= size:
+                f.seek(pos)
+                digest, codec_id, length = PACK_HEADER.unpack(f.read(PACK_HEADER.size))
+                end = pos + PACK_HEADER.size + length
+                if end > size or codec_id not in _DECOMPRESSORS:
+                    break
+                key = digest.hex()
+                if key in self.stored:
+                    self.dead_bytes += PACK_HEADER.size + self.stored[key][1]
+                self.stored[key] = (pos + PACK_HEADER.size, length, codec_id)
+                pos = end
+
+        self.pack_bytes = pos
+        if pos < size and not self.read_only:
+            print(f"[DEBUG] Blob pack: dropping {size - pos} bytes of a truncated record")
+            try:
+                with open(self.path, "r+b") as f:
+                    f.truncate(pos)
+            except OSError as e:
+                print(f"[DEBUG] Blob pack truncate error: {e}")
+
+    def put(self, text):
+        """
+        内容を登録してキーを返す（既にある内容なら何もしない）
+
+        Returns:
+            str: キー
+        """
+        key = blob_key(text)
+        with self.lock:
+            if key not in self.stored and key not in self.pending:
+                self.pending[key] = text
+            if self.touched is not None:
+                self.touched.add(key)
+        return key
+
+    def get(self, key):
+        """
+        キーの内容を読む（パックから1件分だけ seek して読む）
+
+        Returns:
+            str: 内容（見つからない場合は ""）
+        """
+        # パックの置き換えと重ならないよう、位置を引いてから読み終わるまで file_lock を保持する
+        with self.file_lock:
+            with self.lock:
+                text = self.pending.get(key)
+                location = self.stored.get(key)
+            if text is not None:
+                return text
+            if location is None:
+                return ""
+            offset, length, codec_id = location
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read(length)
+            except OSError as e:
+                print(f"[DEBUG] Blob read error ({key}): {e}")
+                return ""
+        try:
+            return _DECOMPRESSORS[codec_id](data).decode("utf-8")
+        except (ValueError, zlib.error, lzma.LZMAError) as e:
+            print(f"[DEBUG] Blob decode error ({key}): {e}")
+            return ""
+
+    def flush(self):
+        """
+        保留中の内容を圧縮してパックにまとめて追記する（fsync まで行う）
+
+        履歴のジャーナルに参照を書く前に呼ぶ（参照先が先にディスクにあるようにする）。
+        圧縮と書き込みは lock の外で行うので、その間も put() / get() は待たされない。
+        """
+        if self.read_only:
+            raise RuntimeError("the blob store is opened read-only")
+        with self.io_lock:
+            with self.lock:
+                pending = list(self.pending.items())
+                pack_bytes = self.pack_bytes
+            if not pending:
+                return
+
+            codec_id, compress, _ = CODECS[self.codec]
+            records = []
+            for key, text in pending:
+                payload = compress(text.encode("utf-8"))
+                records.append((key, PACK_HEADER.pack(bytes.fromhex(key), codec_id, len(payload)) + payload))
+
+            # 追記は既存のレコードを動かさないので、get() と並行してよい
+            with open(self.path, "ab") as f:
+                # 前回途中まで書いたレコードがあれば、その手前から書く
+                if f.tell() != pack_bytes:
+                    f.truncate(pack_bytes)
+                    f.seek(pack_bytes)
+                f.write(b"".join(record for _, record in records))
+                f.flush()
+                os.fsync(f.fileno())
+
+            with self.lock:
+                for key, record in records:
+                    self.stored[key] = (self.pack_bytes + PACK_HEADER.size, len(record) - PACK_HEADER.size, codec_id)
+                    self.pack_bytes += len(record)
+                    self.pending.pop(key, None)
+
+    def begin_collection(self):
+        """
+        collect_garbage() に渡す参照の集合を作る直前に呼ぶ
+
+        ここから collect_garbage() までに put されたキーは、参照の集合になくても消さない
+        （履歴の lock を放してから collect_garbage() を呼んでも、その間の追加を失わない）。
+        """
+        with self.lock:
+            self.touched = set()
+
+    def collect_garbage(self, referenced):
+        """
+        参照されていない blob を外し、無駄な領域が増えていればパックを書き直す
+        （履歴本体を書き出した直後に呼ぶ）
+
+        Args:
+            referenced: begin_collection() の後に集めた、参照されているキーの集合
+        """
+        with self.io_lock:
+            with self.lock:
+                live = set(referenced) | (self.touched or set())
+                self.touched = None
+                unused = [key for key in self.stored if key not in live]
+                for key in unused:
+                    self.dead_bytes += PACK_HEADER.size + self.stored.pop(key)[1]
+                for key in [key for key in self.pending if key not in live]:
+                    del self.pending[key]
+
+                live_bytes = self.pack_bytes - self.dead_bytes
+                rewrite = self.dead_bytes > max(PACK_COMPACT_MIN_BYTES, live_bytes)
+                stored = dict(self.stored)
+            if unused:
+                print(f"[DEBUG] Released {len(unused)} unreferenced blobs")
+            if rewrite:
+                self._rewrite(stored)
+
+    def _rewrite(self, stored):
+        """
+        使用中のレコードだけで書き直す（一時ファイル → fsync → 置き換え）
+
+        io_lock を保持して呼ぶ（その間 stored は変わらない）。コピーと fsync は lock の外で行う。
+        置き換え（古いパックの解放に時間がかかることがある）は file_lock だけを保持して行い、
+        put() を待たせない。
+
+        Args:
+            stored: 書き直し前の stored のコピー
+        """
+        temp_path = str(self.path) + ".tmp"
+        new_stored = {}
+        pos = 0
+        with open(self.path, "rb") as src, open(temp_path, "wb") as dst:
+            for key, (offset, length, codec_id) in stored.items():
+                src.seek(offset - PACK_HEADER.size)
+                dst.write(src.read(PACK_HEADER.size + length))
+                new_stored[key] = (pos + PACK_HEADER.size, length, codec_id)
+                pos += PACK_HEADER.size + length
+            dst.flush()
+            os.fsync(dst.fileno())
+
+        # get() は file_lock を保持して位置を引いてから読むので、置き換えの前後で古い位置を読むことはない
+        with self.file_lock:
+            os.replace(temp_path, self.path)
+            with self.lock:
+                print(f"[DEBUG] Blob pack rewritten: {self.pack_bytes} -> {pos} bytes")
+                self.stored = new_stored
+                self.pack_bytes = pos
+                self.dead_bytes = 0
+
+    def stats(self):
+        """
+        保存状況
+
+        Returns:
+            dict: blobs（件数）, disk_bytes（パックのサイズ）, live_bytes（使用中のレコード）,
+                  raw_bytes（展開後）, pending（未書き込み件数）
+        """
+        with self.lock:
+            keys = list(self.stored)
+            pending = len(self.pending)
+            disk_bytes = self.pack_bytes
+            live_bytes = self.pack_bytes - self.dead_bytes
+        raw_bytes = sum(len(self.get(key).encode("utf-8")) for key in keys)
+        return {"blobs": len(keys), "disk_bytes": disk_bytes, "live_bytes": live_bytes,
+                "raw_bytes": raw_bytes, "pending": pending}
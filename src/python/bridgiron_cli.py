@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - コマンドライン版
+
+GUI（tkinter / Windows API）を読み込まずにCC報告を取得する。
+シェルスクリプトやエディタのタスクから呼び出す用途を想定し、起動を軽く保つ。
+
+実行方法:
+    python bridgiron_cli.py report [--project PATH] [--json] [--full] [--back N] [--format STAGES]
+                                   [--budget TOKENS] [--tokenizer FILE]
+    python bridgiron_cli.py projects [--json]
+    python bridgiron_cli.py usage [--project PATH] [--json] [--sessions]
+    python bridgiron_cli.py import [--project PATH] [--prefix TEXT] [--backend sqlite|json] [--json]
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+
+def cmd_report(args):
+    """report サブコマンド：CC報告を標準出力に書き出す"""
+    # cc_report のデバッグ出力で標準出力を汚さないよう、読み込みから stderr に逃がす
+    started = time.perf_counter()
+    format_stats = {}
+    with contextlib.redirect_stdout(sys.stderr):
+        from cc_report import get_cc_report
+        if args.format is not None:
+            from report_format import set_default_pipeline, parse_stage_names
+            set_default_pipeline(parse_stage_names(args.format))
+        if args.tokenizer:
+            from token_budget import TokenEstimator, set_token_estimator
+            set_token_estimator(TokenEstimator.calibrated(args.tokenizer))
+        success, result = get_cc_report(args.project, full_search=args.full, back=args.back,
+                                        format_stats=format_stats, token_budget=args.budget)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        import json
+        envelope = {
+            "ok": success,
+            "project": args.project,
+            "report": result if success else None,
+            "error": None if success else result,
+            "elapsed_ms": round(elapsed_ms, 3),
+            "format": format_stats or None,
+        }
+        sys.stdout.write(json.dumps(envelope, ensure_ascii=False) + "\n")
+    elif success:
+        for section, kind, tokens in format_stats.get("dropped", []):
+            sys.stderr.write(f"bridgiron: dropped {kind} in '{section}' (~{tokens} tokens)\n")
+        sys.stdout.write(result)
+        if not result.endswith("\n"):
+            sys.stdout.write("\n")
+    else:
+        sys.stderr.write(f"bridgiron: {result}\n")
+
+    return 0 if success else 1
+
+
+def cmd_projects(args):
+    """projects サブコマンド：ログのあるプロジェクト（ディレクトリ名）を一覧表示"""
+    with contextlib.redirect_stdout(sys.stderr):
+        from project_registry import get_project_registry
+        log_dirs = get_project_registry().list_log_dirs()
+
+    if args.json:
+        import json
+        sys.stdout.write(json.dumps([{"name": d.name, "path": str(d)} for d in log_dirs],
+                                    ensure_ascii=False) + "\n")
+    else:
+        for log_dir in log_dirs:
+            sys.stdout.write(log_dir.name + "\n")
+    return 0
+
+
+def cmd_usage(args):
+    """usage サブコマンド：プロジェクトと最新セッションのトークン使用量を表示"""
+    with contextlib.redirect_stdout(sys.stderr):
+        from usage_meter import get_project_usage, USAGE_FIELDS
+        project_totals, session_totals, sessions = get_project_usage(args.project)
+
+    if args.json:
+        import json
+        envelope = {
+            "project": args.project,
+            "total": project_totals.to_dict(),
+            "session": session_totals.to_dict() if session_totals else None,
+        }
+        if args.sessions:
+            envelope["sessions"] = [dict(totals.to_dict(), file=path.name) for path, totals in sessions]
+        sys.stdout.write(json.dumps(envelope, ensure_ascii=False) + "\n")
+        return 0
+
+    if not sessions:
+        sys.stderr.write("bridgiron: no_log\n")
+        return 1
+
+    rows = [("session", session_totals), ("project", project_totals)]
+    if args.sessions:
+        rows += [(path.stem, totals) for path, totals in sessions]
+    name_width = max(len(name) for name, _ in rows)
+    header = ["input", "output", "cache_write", "cache_read", "total", "messages"]
+    sys.stdout.write(" " * name_width + "".join(f"{h:>13}" for h in header) + "\n")
+    for name, totals in rows:
+        values = [getattr(totals, field) for field in USAGE_FIELDS] + [totals.total_tokens, totals.messages]
+        sys.stdout.write(f"{name:<{name_width}}" + "".join(f"{v:>13,}" for v in values) + "\n")
+    return 0
+
+
+def cmd_import(args):
+    """import サブコマンド：プロジェクトの全 SOR/EOR 報告を CC→GPT 履歴に取り込む"""
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        from settings import Settings, SETTINGS_DIR
+        from history_store import open_history
+        from cc_report import import_reports
+        settings = Settings()
+        prefix = settings.cc_prefix if args.prefix is None else args.prefix.replace("\\n", "\n")
+        history = open_history(args.backend, SETTINGS_DIR, known_prefixes=(settings.cc_prefix,))
+        try:
+            imported = import_reports(args.project, history, prefix)
+        finally:
+            history.close()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        import json
+        envelope = {
+            "project": args.project,
+            "backend": args.backend,
+            "imported": imported,
+            "elapsed_ms": round(elapsed_ms, 3),
+        }
+        sys.stdout.write(json.dumps(envelope, ensure_ascii=False) + "\n")
+    else:
+        sys.stdout.write(f"imported {imported} reports into the {args.backend} history\n")
+
+    if args.backend == "json":
+        from copy_history import CopyHistory
+        sys.stderr.write(f"bridgiron: the json history keeps only the newest {CopyHistory.MAX_ENTRIES} entries; "
+                         "use --backend sqlite to keep every report\n")
+    if settings.history_backend != args.backend:
+        sys.stderr.write(f"bridgiron: the GUI uses the {settings.history_backend} history; "
+                         f"set history_backend={args.backend} in settings.txt to see the imported reports\n")
+    return 0
+
+
+def build_parser():
+    """引数パーサーを構築"""
+    parser = argparse.ArgumentParser(prog="bridgiron", description="Bridgiron command line interface")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report = subparsers.add_parser("report", help="print the latest Claude Code report")
+    report.add_argument("--project", default=os.getcwd(),
+                        help="Claude Code project path (default: current directory)")
+    report.add_argument("--json", action="store_true",
+                        help="print a JSON envelope with timing instead of the raw report")
+    report.add_argument("--full", action="store_true",
+                        help="search SOR/EOR markers across the whole session")
+    report.add_argument("--back", type=int, default=0, metavar="N",
+                        help="print the report N reports before the latest one")
+    report.add_argument("--format", metavar="STAGES",
+                        help="comma-separated formatter stages (ansi,whitespace,dedupe,code,traces; "
+                             "default: ansi, empty for none)")
+    report.add_argument("--budget", type=int, default=0, metavar="TOKENS",
+                        help="trim the report to about this many tokens (low-priority sections first)")
+    report.add_argument("--tokenizer", metavar="FILE",
+                        help="calibrate the token estimate with a .tiktoken or tokenizer.json file")
+    report.set_defaults(func=cmd_report)
+
+    projects = subparsers.add_parser("projects", help="list Claude Code projects that have session logs")
+    projects.add_argument("--json", action="store_true", help="print a JSON list")
+    projects.set_defaults(func=cmd_projects)
+
+    usage = subparsers.add_parser("usage", help="print token usage of the latest session and the project")
+    usage.add_argument("--project", default=os.getcwd(),
+                       help="Claude Code project path (default: current directory)")
+    usage.add_argument("--json", action="store_true", help="print a JSON object")
+    usage.add_argument("--sessions", action="store_true", help="also list every session")
+    usage.set_defaults(func=cmd_usage)
+
+    import_ = subparsers.add_parser("import", help="import every SOR/EOR report of a project into the copy history")
+    import_.add_argument("--project", default=os.getcwd(),
+                         help="Claude Code project path (default: current directory)")
+    import_.add_argument("--prefix",
+                         help="text prepended to each report, \\n for a newline (default: the CC prefix setting)")
+    import_.add_argument("--backend", choices=("sqlite", "json"), default="sqlite",
+                         help="history to import into (default: sqlite, which keeps every report; "
+                              "json keeps only the newest 50 and must not be used while the GUI is running)")
+    import_.add_argument("--json", action="store_true", help="print a JSON object")
+    import_.set_defaults(func=cmd_import)
+
+    return parser
+
+
+def main(argv=None):
+    # パイプ先に書けない文字があっても落ちないようにする
+    try:
+        sys.stdout.reconfigure(errors="replace")
+    except (AttributeError, ValueError):
+        pass
+
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
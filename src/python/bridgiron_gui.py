@@ -17,6 +17,7 @@ from datetime import datetime
 import ctypes
 import threading
 import time
+import queue
 import pyperclip
 from ctypes import wintypes, WINFUNCTYPE
 from pathlib import Path
@@ -26,9 +27,16 @@ from winapi import (
     get_window_rect, get_monitor_work_area, is_window_maximized,
     get_foreground_window, get_window_parent
 )
-from cc_report import get_cc_report
+from cc_report import get_cc_report, get_report_cache_stats, ReportExecutor
+from report_format import set_default_pipeline, parse_stage_names
+from token_budget import TokenEstimator, set_token_estimator, estimate_tokens
+from report_delta import make_delta
+from report_watcher import ReportPrefetcher
+from report_panel import ReportPanel
+from usage_meter import get_project_usage, format_token_count
 from settings import Settings, SETTINGS_DIR, SETTINGS_FILE
-from copy_history import CopyHistory, ClipboardWatcher
+from copy_history import ClipboardWatcher
+from history_store import open_history
 from history_popup import HistoryPopup
 
 # ========================================
@@ -37,6 +45,17 @@ from history_popup import HistoryPopup
 
 VERSION = "1.15"
 
+# CC報告取得の結果確認間隔（ms）とタイムアウト（秒）
+REPORT_POLL_INTERVAL_MS = 30
+REPORT_TIMEOUT_SEC = 15
+
+# トークン使用量を読み直す間隔（統合ティックの回数、100ms 単位）
+USAGE_UPDATE_TICKS = 50
+
+# 差分モードで比較相手を探すとき、さかのぼる CC→GPT 履歴の最大件数
+# （同じ報告を続けてコピーした分は飛ばし、内容の異なる直近の報告と比べる）
+REPORT_DELTA_LOOKBACK = 10
+
 # プロジェクトルート（EXE実行時とスクリプト実行時で分岐）
 import sys
 import shutil
@@ -218,6 +237,7 @@ LANG = {
         "msg_no_project": "プロジェクトパスが見つかりません",
         "msg_no_log": "Claude Codeのログが見つかりません",
         "msg_no_report": "報告が見つかりませんでした",
+        "msg_report_timeout": "報告の取得がタイムアウトしました",
         "section_bookmarklet": "ブックマークレット",
         "label_title": "タイトル:",
         "btn_copy_title": "タイトルをコピー",
@@ -239,7 +259,18 @@ LANG = {
         "history_title_gpt": "GPT→CC履歴",
         "history_title_cc": "CC→GPT履歴",
         "no_history": "履歴がありません",
+        "history_more": "さらに表示",
         "copied_from_history": "履歴からコピーしました",
+        "btn_projects": "PJ一覧",
+        "format_stats": "{:,} → {:,} バイト（{}）",
+        "format_stats_cached": "前回の整形結果を使用",
+        "token_stats": "約 {:,} → {:,} トークン",
+        "token_dropped": "省略: {}",
+        "delta_stats": "差分: {:,} バイト / 約 {:,} トークン削減",
+        "usage_mini": "セッション {}  累計 {}",
+        "projects_title": "プロジェクト別CC報告",
+        "btn_refresh_projects": "更新",
+        "msg_projects_status": "{} / {} 件（{:.0f} ms）",
     },
     "en": {
         "window_title": "Bridgiron",
@@ -257,6 +288,7 @@ LANG = {
         "msg_no_project": "Project path not found",
         "msg_no_log": "Claude Code log not found",
         "msg_no_report": "Report not found",
+        "msg_report_timeout": "Timed out while reading the report",
         "section_bookmarklet": "Bookmarklet",
         "label_title": "Title:",
         "btn_copy_title": "Copy Title",
@@ -278,7 +310,18 @@ LANG = {
         "history_title_gpt": "GPT→CC History",
         "history_title_cc": "CC→GPT History",
         "no_history": "No history",
+        "history_more": "Show more",
         "copied_from_history": "Copied from history",
+        "btn_projects": "Projects",
+        "format_stats": "{:,} → {:,} bytes ({})",
+        "format_stats_cached": "Reused the previous formatting",
+        "token_stats": "~{:,} → {:,} tokens",
+        "token_dropped": "dropped: {}",
+        "delta_stats": "delta: saved {:,} bytes / ~{:,} tokens",
+        "usage_mini": "session {}  total {}",
+        "projects_title": "CC Reports by Project",
+        "btn_refresh_projects": "Refresh",
+        "msg_projects_status": "{} / {} found ({:.0f} ms)",
     }
 }
 
@@ -416,11 +459,13 @@ class BridgironApp:
         self.settings = Settings()
 
         # コピー履歴インスタンス
-        self.copy_history = CopyHistory(SETTINGS_DIR / 'copy_history.json')
+        self.copy_history = open_history(self.settings.history_backend, SETTINGS_DIR,
+                                         known_prefixes=(self.settings.cc_prefix,))
 
         # 履歴ポップアップの参照を保持
         self.history_popup_gpt = None
         self.history_popup_cc = None
+        self.report_panel = None
 
         # クリップボード監視開始
         self.clipboard_watcher = ClipboardWatcher(
@@ -428,6 +473,30 @@ class BridgironApp:
         )
         self.clipboard_watcher.start()
 
+        # CC報告の取得はワーカースレッドで行い、結果はキュー経由で受け取る
+        self.report_results = queue.Queue()
+        self.report_executor = ReportExecutor(self.report_results, func=self._fetch_cc_report)
+        self.pending_report = None  # 実行中の要求（チケット番号・開始時刻・枕文など）
+        self.report_poll_scheduled = False
+
+        # トークン使用量の集計（追記された行だけを読むので、2回目以降は軽い）
+        self.usage_results = queue.Queue()
+        self.usage_executor = ReportExecutor(self.usage_results, func=get_project_usage)
+        self.usage_pending = None  # 実行中の要求のチケット番号
+        self.usage_text = ""
+
+        # CC報告の整形ステージ
+        set_default_pipeline(parse_stage_names(self.settings.report_format))
+        if self.settings.report_tokenizer_file:
+            try:
+                set_token_estimator(TokenEstimator.calibrated(self.settings.report_tokenizer_file))
+            except Exception as e:
+                print(f"[DEBUG] Failed to calibrate token estimator: {e}")
+
+        # CC報告の先読み（report_prefetch=1 の場合のみ）
+        self.report_prefetcher = None
+        self.restart_report_prefetcher()
+
         # ダークモードスタイル設定
         self.style = setup_dark_style(root)
 
@@ -435,14 +504,14 @@ class BridgironApp:
         self.root.title(LANG[self.settings.language]["window_title"])
         if self.settings.first_run == "1":
             # 初回起動時: メッセージ分の高さを追加
-            self.root.geometry("600x690")
-            self.root.minsize(500, 620)
-            self.full_geometry = "600x690"
+            self.root.geometry("600x710")
+            self.root.minsize(500, 640)
+            self.full_geometry = "600x710"
         else:
             # 2回目以降: 通常の高さ
-            self.root.geometry("600x640")
-            self.root.minsize(500, 570)
-            self.full_geometry = "600x640"
+            self.root.geometry("600x660")
+            self.root.minsize(500, 590)
+            self.full_geometry = "600x660"
 
         # ミニモード関連
         self.is_mini_mode = False
@@ -579,6 +648,10 @@ class BridgironApp:
         self.btn_copy_cc_report.pack(fill=tk.X, pady=(5, 0))
         self.ui_elements["btn_copy_cc_report"] = self.btn_copy_cc_report
 
+        # 整形前後のサイズと各ステージの所要時間
+        self.format_stats_label = ttk.Label(section_cc, text="", foreground=COLORS["label_fg"])
+        self.format_stats_label.pack(fill=tk.X, pady=(2, 0))
+
         # 履歴ボタン用フレーム（左右分割）
         history_btn_frame = tk.Frame(section_cc, bg='#2d2d2d')
         history_btn_frame.pack(fill='x', pady=(5, 0))
@@ -611,7 +684,22 @@ class BridgironApp:
             relief='flat',
             cursor='hand2'
         )
-        self.history_cc_btn.pack(side='left', fill='x', expand=True, padx=(2, 0))
+        self.history_cc_btn.pack(side='left', fill='x', expand=True, padx=(2, 2))
+
+        # 右端：複数プロジェクトの報告一覧
+        self.projects_btn = tk.Button(
+            history_btn_frame,
+            text=self.get_text("btn_projects"),
+            command=self.show_report_panel,
+            bg='#3c3c3c',
+            fg='white',
+            activebackground='#505050',
+            activeforeground='white',
+            font=('Arial', 9),
+            relief='flat',
+            cursor='hand2'
+        )
+        self.projects_btn.pack(side='left', padx=(2, 0))
 
         # キーボードショートカット Alt+C
         self.root.bind("<Alt-c>", lambda e: self.copy_cc_report())
@@ -801,6 +889,8 @@ class BridgironApp:
             self.history_gpt_btn.config(text=self.get_text("history_gpt_to_cc"))
         if hasattr(self, "history_cc_btn"):
             self.history_cc_btn.config(text=self.get_text("history_cc_to_gpt"))
+        if hasattr(self, "projects_btn"):
+            self.projects_btn.config(text=self.get_text("btn_projects"))
 
         # ミニモード用ボタン
         if hasattr(self, "mini_btn"):
@@ -871,6 +961,7 @@ class BridgironApp:
             # 設定を保存
             self.settings.project_path = folder
             self.settings.save()
+            self.restart_report_prefetcher()
 
     def on_project_path_change(self, event=None):
         """プロジェクトパス変更時の処理"""
@@ -878,6 +969,7 @@ class BridgironApp:
         if new_path and new_path != self.settings.project_path:
             self.settings.project_path = new_path
             self.settings.save()
+            self.restart_report_prefetcher()
 
     def on_cc_prefix_change(self, event=None):
         """枕文変更時の処理"""
@@ -888,6 +980,20 @@ class BridgironApp:
             self.settings.cc_prefix = new_prefix
             self.settings.save()
 
+    def restart_report_prefetcher(self):
+        """CC報告の先読みを（再）開始する"""
+        if self.report_prefetcher:
+            self.report_prefetcher.stop()
+            self.report_prefetcher = None
+
+        if self.settings.report_prefetch == "1" and self.settings.project_path:
+            self.report_prefetcher = ReportPrefetcher(
+                self.settings.project_path,
+                full_search=self.settings.report_search == "full",
+                token_budget=int(self.settings.report_token_budget)
+            )
+            self.report_prefetcher.start()
+
     def copy_cc_report(self):
         """Claude Codeの完了報告をクリップボードにコピー"""
         project_path = self.project_path_entry.get().strip()
@@ -897,10 +1003,100 @@ class BridgironApp:
             self.show_notification(self.get_text("msg_no_project"))
             return
 
-        # CC報告を取得
-        success, result = get_cc_report(project_path)
+        # 枕文を取得（入力欄から）
+        prefix = self.cc_prefix_entry.get().replace("\\n", "\n")
+
+        # 先読み済みならキャッシュをそのまま使う（トークン予算も先読み時に適用済み）
+        delta = self.settings.report_delta == "1"
+        format_stats = {}
+        cached = self.report_prefetcher.get_cached(project_path, format_stats) if self.report_prefetcher else None
+        if cached is not None and not delta:
+            print("[DEBUG] copy_cc_report: using prefetched report")
+            self.report_executor.cancel()
+            self.pending_report = None
+            self._finish_cc_report(project_path, prefix, cached, format_stats)
+            return
+
+        # ワーカースレッドで取得（実行中の古い要求は取り消される）
+        # 差分モードでは差分の計算もワーカーで行う（先読み済みの報告も同様）
+        ticket = self.report_executor.submit(
+            project_path, full_search=self.settings.report_search == "full", format_stats=format_stats,
+            token_budget=int(self.settings.report_token_budget), prefix=prefix, delta=delta, prefetched=cached
+        )
+        self.pending_report = {
+            "ticket": ticket,
+            "project_path": project_path,
+            "prefix": prefix,
+            "started": time.monotonic(),
+            "format_stats": format_stats,
+        }
+        self._schedule_report_poll()
+
+    def _schedule_report_poll(self):
+        """結果キューの確認を予約（二重に予約しない）"""
+        if not self.report_poll_scheduled:
+            self.report_poll_scheduled = True
+            self.root.after(REPORT_POLL_INTERVAL_MS, self._poll_report_results)
+
+    def _poll_report_results(self):
+        """CC報告取得の結果キューを確認（root.after で繰り返し呼ばれる）"""
+        self.report_poll_scheduled = False
+        pending = self.pending_report
+        if pending is None:
+            return
+
+        while True:
+            try:
+                ticket, result = self.report_results.get_nowait()
+            except queue.Empty:
+                break
+            # 後から出された要求に置き換えられた結果は捨てる
+            if ticket == pending["ticket"]:
+                self.pending_report = None
+                self._finish_cc_report(pending["project_path"], pending["prefix"], result,
+                                       pending["format_stats"])
+                return
+
+        if time.monotonic() - pending["started"] > REPORT_TIMEOUT_SEC:
+            print(f"[DEBUG] CC report request {pending['ticket']} timed out")
+            self.report_executor.cancel(pending["ticket"])
+            self.pending_report = None
+            self.show_notification(self.get_text("msg_report_timeout"))
+            return
+
+        self._schedule_report_poll()
+
+    def _fetch_cc_report(self, project_path, cancel_event=None, prefix="", delta=False, prefetched=None,
+                         format_stats=None, **kwargs):
+        """
+        CC報告を取得し、差分モードなら差分も作る（report_executor のワーカースレッドで実行）
+
+        Returns:
+            tuple: (成功フラグ, メッセージまたはエラーコード, クリップボード用の差分 or None)
+        """
+        if prefetched is not None:
+            success, result = prefetched
+        else:
+            success, result = get_cc_report(project_path, cancel_event=cancel_event, format_stats=format_stats,
+                                            **kwargs)
+        clipboard_report = None
+        if success and delta:
+            clipboard_report = self._make_report_delta(prefix, result)
+            if clipboard_report is not None and format_stats is not None:
+                format_stats["delta_saved_bytes"] = (len(result.encode("utf-8"))
+                                                     - len(clipboard_report.encode("utf-8")))
+                format_stats["delta_saved_tokens"] = estimate_tokens(result) - estimate_tokens(clipboard_report)
+        return (success, result, clipboard_report)
+
+    def _finish_cc_report(self, project_path, prefix, report_result, format_stats=None):
+        """取得したCC報告をクリップボードと履歴に反映（メインスレッドで実行）"""
+        # 差分モードの結果は (成功フラグ, 報告, 差分)、失敗時・先読みの結果は (成功フラグ, 報告 or エラーコード)
+        success, result = report_result[:2]
+        clipboard_report = report_result[2] if len(report_result) > 2 else None
+        print(f"[DEBUG] Report cache stats: {get_report_cache_stats()}")
 
         if not success:
+            self._show_format_stats(None)
             # エラーコードに対応するメッセージを表示
             error_messages = {
                 "no_log": self.get_text("msg_no_log"),
@@ -909,13 +1105,75 @@ class BridgironApp:
             self.show_notification(error_messages.get(result, self.get_text("msg_no_report")))
             return
 
-        # 枕文を取得（入力欄から）
-        prefix = self.cc_prefix_entry.get().replace("\\n", "\n")
-        full_text = prefix + result
+        # 差分モード：前回の報告から変わった部分だけをコピー（履歴には全文を残す）
+        self._show_format_stats(format_stats)
+
+        self._copy_report(prefix, result, clipboard_report)
+
+        # 設定を保存
+        self.settings.project_path = project_path
+        self.settings.cc_prefix = prefix
+        self.settings.save()
+
+        self.show_notification(self.get_text("msg_copied"))
+
+    def _make_report_delta(self, prefix, report):
+        """
+        CC→GPT 履歴のうち、今回と内容の異なる直近の報告との差分を作る
+
+        同じ報告をコピーし直した場合（貼り付けに失敗した場合など）は、前回と同じ差分になる。
+
+        Returns:
+            str: 差分テキスト（履歴がない・差分が大きすぎる場合は None）
+        """
+        previous = ""
+        for index in range(REPORT_DELTA_LOOKBACK):
+            content = self.copy_history.get_content("cc_to_gpt", index)
+            if not content:
+                break
+            if prefix and content.startswith(prefix):
+                content = content[len(prefix):]
+            if content != report:
+                previous = content
+                break
+        started = time.perf_counter()
+        delta = make_delta(previous, report)
+        print(f"[DEBUG] Report delta: {'none' if delta is None else len(delta)} chars "
+              f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return delta
+
+    def _show_format_stats(self, stats):
+        """整形前後のサイズ・各ステージの所要時間・トークン数・差分での削減量を表示"""
+        parts = []
+        if stats:
+            if stats.get("cached"):
+                parts.append(self.get_text("format_stats_cached"))
+            elif "stages" in stats:
+                stage_times = " / ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in stats["stages"])
+                parts.append(self.get_text("format_stats").format(stats["before_bytes"], stats["after_bytes"],
+                                                                  stage_times or "-"))
+            if "tokens_before" in stats:
+                parts.append(self.get_text("token_stats").format(stats["tokens_before"], stats["tokens_after"]))
+                if stats["dropped"]:
+                    sections = dict.fromkeys(section or "-" for section, _, _ in stats["dropped"])
+                    parts.append(self.get_text("token_dropped").format(", ".join(sections)))
+            if "delta_saved_bytes" in stats:
+                parts.append(self.get_text("delta_stats").format(stats["delta_saved_bytes"],
+                                                                 stats["delta_saved_tokens"]))
+        print(f"[DEBUG] Format stats: {stats}")
+        self.format_stats_label.config(text="  ".join(parts))
+
+    def _copy_report(self, prefix, report, clipboard_report=None):
+        """
+        枕文 + 報告本文をクリップボードにコピーして履歴に追加
+
+        clipboard_report を指定した場合（差分モード）は、クリップボードにはそちらを、
+        履歴には次回の比較用に全文を入れる。
+        """
+        full_text = prefix + report
 
-        # 枕文 + 報告本文をクリップボードにコピー
         self.root.clipboard_clear()
-        self.root.clipboard_append(full_text)
+        self.root.clipboard_append(prefix + clipboard_report if clipboard_report is not None else full_text)
 
         # 履歴に追加（プレビュー用に枕文を除去）
         self.copy_history.add("cc_to_gpt", full_text, prefix_to_remove=prefix)
@@ -924,12 +1182,38 @@ class BridgironApp:
         if self.history_popup_cc and self.history_popup_cc.winfo_exists():
             self.history_popup_cc.refresh()
 
-        # 設定を保存
-        self.settings.project_path = project_path
-        self.settings.cc_prefix = prefix
-        self.settings.save()
+    def show_report_panel(self):
+        """複数プロジェクトのCC報告一覧を表示（トグル動作）"""
+        if self.report_panel is not None:
+            try:
+                if self.report_panel.winfo_exists():
+                    self.report_panel.destroy()
+                    self.report_panel = None
+                    return
+            except:
+                pass
 
-        self.show_notification(self.get_text("msg_copied"))
+        def on_select(project_path, report):
+            prefix = self.cc_prefix_entry.get().replace("\\n", "\n")
+            self._copy_report(prefix, report)
+            self.show_notification(self.get_text("msg_copied"))
+
+        def on_paths_change(paths):
+            if paths != self.settings.report_projects:
+                self.settings.report_projects = paths
+                self.settings.save()
+
+        # 未設定なら現在のプロジェクトから始める
+        paths = self.settings.report_projects or [self.project_path_entry.get().strip()]
+        panel = ReportPanel(self.root, paths, on_select, on_paths_change, self.get_text,
+                            full_search=self.settings.report_search == "full")
+        self.report_panel = panel
+
+        def on_panel_close():
+            self.report_panel = None
+            panel.destroy()
+
+        panel.protocol("WM_DELETE_WINDOW", on_panel_close)
 
     def open_file(self, filepath):
         """ファイルを関連付けられたエディタで開く"""
@@ -1043,6 +1327,17 @@ class BridgironApp:
         """ミニモード用のフレームを作成"""
         self.mini_frame = tk.Frame(self.root, bg=COLORS["bg"])
 
+        # 下端：トークン使用量（最新セッション・プロジェクト累計）
+        self.mini_usage_label = tk.Label(
+            self.mini_frame,
+            text=self.usage_text,
+            bg=COLORS["bg"],
+            fg="#888888",
+            font=("Arial", 7),
+            anchor="w"
+        )
+        self.mini_usage_label.pack(side="bottom", fill="x", padx=4)
+
         # 水平レイアウト用のフレーム
         btn_container = tk.Frame(self.mini_frame, bg=COLORS["bg"])
         btn_container.pack(fill="both", expand=True, padx=2, pady=2)
@@ -1121,6 +1416,7 @@ class BridgironApp:
         # フレームクリックでもフルモードに戻る
         self.mini_frame.bind("<Button-1>", self.on_mini_click)
         btn_container.bind("<Button-1>", self.on_mini_click)
+        self.mini_usage_label.bind("<Button-1>", self.on_mini_click)
 
     def on_mini_click(self, event):
         """ミニウィンドウのフレーム部分クリック時、フルモードに戻る"""
@@ -1167,6 +1463,11 @@ class BridgironApp:
         if self.tick_count % 2 == 0:
             self._track_cli_position_task()
 
+        # トークン使用量（ミニモードの間だけ、5秒間隔で更新）
+        self._poll_usage_results()
+        if self.tick_count % USAGE_UPDATE_TICKS == 0:
+            self._update_usage_task()
+
         # 次のティックをスケジュール
         self.root.after(100, self._main_tick)
 
@@ -1188,6 +1489,41 @@ class BridgironApp:
         except Exception as e:
             print(f"[DEBUG] CLI tracking error: {e}")
 
+    def _update_usage_task(self):
+        """ミニウィンドウのトークン使用量の更新を要求（前回の集計が終わっていなければ何もしない）"""
+        if not self.is_mini_mode or self.usage_pending is not None:
+            return
+        project_path = self.settings.project_path
+        if not project_path:
+            return
+        self.usage_pending = self.usage_executor.submit(project_path)
+
+    def _poll_usage_results(self):
+        """トークン使用量の集計結果を確認してミニウィンドウに表示"""
+        if self.usage_pending is None:
+            return
+        try:
+            ticket, result = self.usage_results.get_nowait()
+        except queue.Empty:
+            return
+        if ticket != self.usage_pending:
+            return
+        self.usage_pending = None
+
+        # 失敗時は (False, エラーコード) が返る
+        if len(result) != 3:
+            return
+        project_totals, session_totals, _ = result
+        text = self.get_text("usage_mini").format(
+            format_token_count(session_totals.total_tokens if session_totals else 0),
+            format_token_count(project_totals.total_tokens),
+        )
+        if text != self.usage_text:
+            self.usage_text = text
+            self.mini_usage_label.config(text=text)
+            print(f"[DEBUG] Token usage: session={session_totals and session_totals.to_dict()}, "
+                  f"project={project_totals.to_dict()}")
+
     def setup_foreground_hook(self):
         """フォアグラウンドウィンドウ変更のフックを設定"""
         # ==================================================
@@ -1305,6 +1641,12 @@ class BridgironApp:
     def on_closing(self):
         """ウィンドウを閉じる時の処理"""
         self.clipboard_watcher.stop()
+        if self.report_prefetcher:
+            self.report_prefetcher.stop()
+        self.report_executor.shutdown()
+        self.usage_executor.shutdown()
+        # 書き込み待ちの履歴を書き出す
+        self.copy_history.close()
         self.cleanup_hook()
         self.root.destroy()
 
@@ -1341,6 +1683,9 @@ class BridgironApp:
         # 位置とサイズを設定（set_topmostはon_foreground_changed側で呼ばれる）
         self.set_mini_position()
 
+        # トークン使用量をすぐに更新
+        self._update_usage_task()
+
     def switch_to_full_mode(self):
         """フルモードに戻る"""
         if not self.is_mini_mode:
@@ -1387,7 +1732,7 @@ class BridgironApp:
         """ミニウィンドウの位置を設定（マルチモニター対応）"""
         print("[DEBUG] set_mini_position called")
 
-        mini_width, mini_height = 220, 60
+        mini_width, mini_height = 220, 74
 
         if self.settings.mini_window_position == "last_position" and self.last_mini_position:
             x, y = self.last_mini_position
@@ -5,7 +5,25 @@ Bridgiron - Claude Code 報告抽出
 
 import os
 import json
+import heapq
+import mmap
+import threading
+import time
+from collections import deque, namedtuple, OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
+from io_utils import iter_lines_reversed, iter_lines_from, read_signature, FileCursor, PartialLineReader
+from session_index import get_session_index, NO_OFFSET
+from project_registry import get_project_registry
+from report_format import get_default_pipeline
+from token_budget import compact_report
+
+# JSON デコーダ（orjson があれば使い、なければ標準の json にフォールバック）
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 
 def get_log_dir(project_path):
@@ -18,22 +36,46 @@ def get_log_dir(project_path):
     Returns:
         Path: ログディレクトリ（存在しない場合は None）
     """
-    if not project_path:
-        return None
+    return get_project_registry().get_log_dir(project_path)
 
-    user_profile = os.environ.get("USERPROFILE", "")
-    if not user_profile:
-        return None
 
-    path_normalized = project_path.replace("/", "\\").rstrip("\\")
-    path_hash = path_normalized.replace(":", "-").replace("\\", "-").replace("/", "-").replace("_", "-")
+def iter_session_logs_by_mtime(log_dir):
+    """
+    ログディレクトリから .jsonl ファイルを mtime 順（降順）に1件ずつ返す
 
-    log_dir = Path(user_profile) / ".claude" / "projects" / path_hash
+    os.scandir のエントリが持つ stat 情報をそのまま使い、全件ソートはせず
+    ヒープから新しい順に取り出す（呼び出し側が途中で止めればそれ以上は取り出さない）。
 
-    if not log_dir.exists():
-        return None
+    Args:
+        log_dir: ログディレクトリのパス
 
-    return log_dir
+    Yields:
+        Path: .jsonl ファイル（新しい順）
+    """
+    if not log_dir:
+        return
+
+    heap = []
+    try:
+        with os.scandir(log_dir) as it:
+            for entry in it:
+                if not os.path.normcase(entry.name).endswith(".jsonl"):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    mtime_ns = entry.stat().st_mtime_ns
+                except OSError:
+                    continue
+                heap.append((-mtime_ns, entry.name, entry.path))
+    except OSError:
+        return
+
+    # 更新日時の降順で取り出せるヒープにする（O(n)、取り出しは1件 O(log n)）
+    heapq.heapify(heap)
+    while heap:
+        _, _, path = heapq.heappop(heap)
+        yield Path(path)
 
 
 def find_session_logs_by_mtime(log_dir):
@@ -46,15 +88,299 @@ def find_session_logs_by_mtime(log_dir):
     Returns:
         list[Path]: .jsonl ファイルのリスト（新しい順）
     """
-    if not log_dir or not log_dir.exists():
-        return []
+    return list(iter_session_logs_by_mtime(log_dir))
 
-    jsonl_files = list(log_dir.glob("*.jsonl"))
-    if not jsonl_files:
-        return []
 
-    # 更新日時で降順ソート
-    return sorted(jsonl_files, key=lambda f: f.stat().st_mtime, reverse=True)
+# assistant のテキスト行を見分けるためのバイト列（デコード前の絞り込み用）
+ASSISTANT_TYPE_PATTERNS = (b'"type":"assistant"', b'"type": "assistant"')
+TEXT_TYPE_PATTERNS = (b'"type":"text"', b'"type": "text"')
+
+# セッションカーソルの保持上限（超えたら古いものから破棄）
+MAX_SESSION_CURSORS = 64
+
+# 置き換え検出用に保持する、解析済み末尾のバイト数
+CURSOR_SIGNATURE_LENGTH = 64
+
+# 書き込み途中の末尾行が完成するのを待つ最大秒数（0 なら待たずに1回だけ読み直す）
+PARTIAL_LINE_WAIT_SEC = 0.5
+PARTIAL_LINE_POLL_SEC = 0.02
+
+# セッションログごとの差分読み取りカーソル（パス文字列 → _SessionCursor）
+_session_cursors = {}
+_cursor_lock = threading.Lock()
+
+# 実行中の get_cc_report の取り消しフラグと、末尾行の完成待ちの秒数（スレッドごと）
+_cancel_state = threading.local()
+
+
+class ReportCancelled(Exception):
+    """CC報告の取得が取り消された"""
+
+
+def raise_if_cancelled():
+    """現在のスレッドの取得が取り消されていれば ReportCancelled を送出"""
+    event = getattr(_cancel_state, "event", None)
+    if event is not None and event.is_set():
+        raise ReportCancelled()
+
+
+@contextmanager
+def cancellation(cancel_event):
+    """
+    この中で raise_if_cancelled が見る取り消しフラグを設定する（抜けると元に戻す）
+
+    Args:
+        cancel_event: threading.Event（None なら取り消さない）
+    """
+    previous_event = getattr(_cancel_state, "event", None)
+    _cancel_state.event = cancel_event
+    try:
+        yield
+    finally:
+        _cancel_state.event = previous_event
+
+
+class _SessionCursor(FileCursor):
+    """セッションログの差分読み取り状態"""
+
+    def __init__(self, stat, offset, signature, entries):
+        super().__init__(stat, offset, signature)
+        self.entries = entries        # deque[(オフセット, テキスト)]（古い順）
+
+
+def set_json_decoder(loads=None):
+    """
+    ログ解析に使う JSON デコーダを差し替える
+
+    Args:
+        loads: bytes を受け取ってデコードする関数（None なら標準の json.loads）
+    """
+    global _json_loads
+    _json_loads = loads or json.loads
+
+
+def decode_json(line):
+    """ログの1行を set_json_decoder で設定されたデコーダでデコードする"""
+    return _json_loads(line)
+
+
+def _is_assistant_text_candidate(line):
+    """デコードせずに、assistant のテキストを含みうる行かを判定"""
+    return (any(p in line for p in ASSISTANT_TYPE_PATTERNS)
+            and any(p in line for p in TEXT_TYPE_PATTERNS))
+
+
+def _parse_assistant_entry(line):
+    """
+    JSONL の1行を、assistant のテキストを含む場合だけデコードする
+
+    巨大な tool_result / user 行をデコードしないよう、バイト列のまま絞り込んでからデコードする。
+
+    Args:
+        line: 1行分のバイト列
+
+    Returns:
+        tuple: (エントリの dict, 最初の text 要素)（assistant のテキストでない場合は None）
+    """
+    if not _is_assistant_text_candidate(line):
+        return None
+
+    try:
+        entry = _json_loads(line)
+    except ValueError:
+        return None
+
+    if not isinstance(entry, dict) or entry.get("type") != "assistant":
+        return None
+
+    message = entry.get("message", {})
+    content = message.get("content", [])
+
+    for item in content:
+        if isinstance(item, dict) and item.get("type") == "text":
+            text = item.get("text", "")
+            if text:
+                return entry, text
+    return None
+
+
+def _parse_assistant_text(line):
+    """
+    JSONL の1行から assistant のテキストを取り出す
+
+    Args:
+        line: 1行分のバイト列
+
+    Returns:
+        str: 最初の text 要素（assistant のテキストでない場合は None）
+    """
+    parsed = _parse_assistant_entry(line)
+    return parsed[1] if parsed else None
+
+
+def set_partial_line_wait(seconds):
+    """
+    書き込み途中の末尾行が完成するのを待つ最大秒数を設定
+
+    Args:
+        seconds: 待つ秒数（0 なら待たずに末尾を1回だけ読み直す）
+    """
+    global PARTIAL_LINE_WAIT_SEC
+    PARTIAL_LINE_WAIT_SEC = max(0.0, seconds)
+
+
+def _is_complete_json_line(line):
+    """改行で終わっていない末尾行が、JSONとして完結しているか"""
+    # ログの各行は JSON オブジェクトなので、'}' で終わらなければデコードするまでもない
+    if not line.rstrip().endswith(b"}"):
+        return False
+    try:
+        _json_loads(line)
+        return True
+    except ValueError:
+        return False
+
+
+def _complete_partial_line(jsonl_path, offset, line):
+    """
+    書き込み途中の末尾行を、追記された分だけ読み足して完成を待つ
+
+    Args:
+        jsonl_path: .jsonl ファイルのパス
+        offset: 末尾行の行頭オフセット
+        line: 既に読んである末尾行のバイト列
+
+    Returns:
+        tuple: (行のバイト列, 改行まで読めたか)（時間内に完成しなければ None）
+    """
+    reader = PartialLineReader(jsonl_path, offset, line)
+    wait = getattr(_cancel_state, "partial_line_wait", None)
+    deadline = time.monotonic() + (PARTIAL_LINE_WAIT_SEC if wait is None else wait)
+    while True:
+        raise_if_cancelled()
+        grew = reader.read_more()
+        if reader.terminated:
+            return reader.line, True
+        if grew and reader.may_be_complete() and _is_complete_json_line(reader.line):
+            return reader.line, False
+        if not reader.valid or time.monotonic() >= deadline:
+            print(f"[DEBUG] Partial line at {offset} in {os.path.basename(str(jsonl_path))} "
+                  f"({reader.length} bytes) did not complete")
+            return None
+        time.sleep(PARTIAL_LINE_POLL_SEC)
+
+
+def _read_signature(jsonl_path, offset):
+    """解析済み位置の直前にあるバイト列を読む"""
+    return read_signature(jsonl_path, offset, CURSOR_SIGNATURE_LENGTH)
+
+
+def _scan_recent_entries(jsonl_path, count):
+    """
+    ファイル末尾から逆読みして直近N件の assistant テキストを集める
+
+    Returns:
+        tuple: (deque[(オフセット, テキスト)]（古い順）, 解析済みバイト位置)
+    """
+    entries = deque(maxlen=count)
+    consumed = None
+
+    # 末尾から逆読みし、必要件数が揃った時点で打ち切る
+    for offset, line in iter_lines_reversed(jsonl_path):
+        raise_if_cancelled()
+        if consumed is None:
+            # 最後の改行より後ろの断片は、JSONとして完結している場合のみ解析済みとする
+            # （書き込み途中なら完成を少し待つ。前のターンの報告を返さないため）
+            consumed = offset
+            if line.strip():
+                if _is_complete_json_line(line):
+                    consumed = offset + len(line)
+                else:
+                    completed = _complete_partial_line(jsonl_path, offset, line)
+                    if completed is not None:
+                        line, terminated = completed
+                        consumed = offset + len(line) + (1 if terminated else 0)
+
+        text = _parse_assistant_text(line)
+        if text is None:
+            continue
+
+        entries.appendleft((offset, text))
+        if len(entries) >= count:
+            break
+
+    return entries, consumed or 0
+
+
+def _advance_cursor(jsonl_path, cursor):
+    """
+    前回の解析済み位置以降に追記された行だけを解析してカーソルを進める
+    """
+    for offset, line, terminated in iter_lines_from(jsonl_path, cursor.offset):
+        raise_if_cancelled()
+        # 書き込み途中の末尾行は少し待ち、完結しなければ解析済みにしない
+        if not terminated and not _is_complete_json_line(line):
+            completed = _complete_partial_line(jsonl_path, offset, line)
+            if completed is None:
+                break
+            line, terminated = completed
+
+        text = _parse_assistant_text(line)
+        if text is not None:
+            cursor.entries.append((offset, text))
+        cursor.offset = offset + len(line) + (1 if terminated else 0)
+
+
+def _collect_recent_assistant_entries(jsonl_path, count=5):
+    """
+    JSONL ログファイルから直近N件の assistant テキストをオフセット付きで取得
+
+    セッションログは追記専用なので、前回の解析位置をカーソルとして保持し、
+    2回目以降は追記されたバイトだけを解析する。
+    ファイルが縮んだ・置き換えられた場合はカーソルを破棄して全体を再走査する。
+
+    Args:
+        jsonl_path: .jsonl ファイルのパス
+        count: 取得件数
+
+    Returns:
+        list[tuple]: (行頭オフセット, テキスト) のリスト（古い順）
+    """
+    key = str(jsonl_path)
+    # 走査前に stat を取る（走査中の追記は次回の差分として拾う）
+    stat = os.stat(jsonl_path)
+
+    # lock はカーソルの出し入れだけに使い、読み取り（末尾行の完成待ちを含む）は外で行う。
+    # 取り出したカーソルはこのスレッドだけが触る（同じファイルを同時に読む別スレッドは作り直す）
+    with _cursor_lock:
+        cursor = _session_cursors.pop(key, None)
+
+    if cursor is not None and cursor.entries.maxlen == count and cursor.is_same_file(stat):
+        if not cursor.is_unchanged(stat):
+            if _read_signature(jsonl_path, cursor.offset) == cursor.signature:
+                _advance_cursor(jsonl_path, cursor)
+            else:
+                cursor = None
+    else:
+        cursor = None
+
+    if cursor is None:
+        entries, consumed = _scan_recent_entries(jsonl_path, count)
+        cursor = _SessionCursor(stat, consumed, b"", entries)
+    else:
+        cursor.size = stat.st_size
+        cursor.mtime_ns = stat.st_mtime_ns
+
+    cursor.signature = _read_signature(jsonl_path, cursor.offset)
+    entries = list(cursor.entries)
+
+    # 最近使ったものを末尾に置き直し、上限を超えたら古いものから破棄
+    with _cursor_lock:
+        _session_cursors[key] = cursor
+        while len(_session_cursors) > MAX_SESSION_CURSORS:
+            del _session_cursors[next(iter(_session_cursors))]
+
+    return entries
 
 
 def _collect_recent_assistant_texts(jsonl_path, count=5):
@@ -72,40 +398,57 @@ def _collect_recent_assistant_texts(jsonl_path, count=5):
         return []
 
     try:
-        with open(jsonl_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        return [text for _, text in _collect_recent_assistant_entries(jsonl_path, count)]
+    except ReportCancelled:
+        raise
+    except Exception:
+        return []
 
-        texts = []
-        for line in reversed(lines):
-            line = line.strip()
-            if not line:
-                continue
 
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
+# 直近何件の assistant テキストから SOR/EOR を探すか
+RECENT_MESSAGE_COUNT = 5
 
-            if entry.get("type") == "assistant":
-                message = entry.get("message", {})
-                content = message.get("content", [])
+SOR_MARKER = "---SOR---"
+EOR_MARKER = "---EOR---"
+SOR_MARKER_BYTES = SOR_MARKER.encode("utf-8")
+EOR_MARKER_BYTES = EOR_MARKER.encode("utf-8")
 
-                for item in content:
-                    if isinstance(item, dict) and item.get("type") == "text":
-                        text = item.get("text", "")
-                        if text:
-                            texts.append(text)
-                            break
 
-                if len(texts) >= count:
-                    break
+def _extract_report_from_entries(entries):
+    """
+    assistant テキスト群から報告本文を取り出す
+    SOR/EORマーカーがあればマーカー間の本文を、なければ最新1件を返す
 
-        # 古い順に戻す
-        texts.reverse()
-        return texts
+    Args:
+        entries: (行頭オフセット, テキスト) のリスト（古い順）
 
-    except Exception:
-        return []
+    Returns:
+        tuple: (報告本文, SOR を含むエントリのオフセット)
+               マーカーがない場合のオフセットは NO_OFFSET、本文がない場合は (None, NO_OFFSET)
+    """
+    if not entries:
+        return None, NO_OFFSET
+
+    # SOR/EOR検索（メッセージを結合して検索）
+    combined_text = "\n".join(text for _, text in entries)
+
+    sor_pos = combined_text.rfind(SOR_MARKER)
+    eor_pos = combined_text.rfind(EOR_MARKER)
+
+    if sor_pos != -1 and eor_pos != -1 and sor_pos < eor_pos:
+        # マーカー間を抽出（マーカー行自体は除去）
+        content = combined_text[sor_pos + len(SOR_MARKER):eor_pos]
+
+        # SOR を含むエントリを特定（結合時の改行1文字ずつを加算）
+        text_start = 0
+        for offset, text in entries:
+            text_end = text_start + len(text)
+            if sor_pos < text_end:
+                return content.strip(), offset
+            text_start = text_end + 1
+
+    # フォールバック：従来方式（最新1件）
+    return entries[-1][1], NO_OFFSET
 
 
 def extract_latest_assistant_message(jsonl_path):
@@ -119,47 +462,673 @@ def extract_latest_assistant_message(jsonl_path):
     Returns:
         str: assistant の最新メッセージ（見つからない場合は None）
     """
-    recent_messages = _collect_recent_assistant_texts(jsonl_path, count=5)
-    if not recent_messages:
+    if not jsonl_path or not jsonl_path.exists():
+        return None
+
+    try:
+        entries = _collect_recent_assistant_entries(jsonl_path, count=RECENT_MESSAGE_COUNT)
+    except ReportCancelled:
+        raise
+    except Exception:
         return None
 
-    # SOR/EOR検索（直近5件のメッセージを結合して検索）
-    combined_text = "\n".join(recent_messages)
-    sor_marker = "---SOR---"
-    eor_marker = "---EOR---"
+    message, _ = _extract_report_from_entries(entries)
+    return message
 
-    sor_pos = combined_text.rfind(sor_marker)
-    eor_pos = combined_text.rfind(eor_marker)
 
-    if sor_pos != -1 and eor_pos != -1 and sor_pos < eor_pos:
-        # マーカー間を抽出（マーカー行自体は除去）
-        content = combined_text[sor_pos + len(sor_marker):eor_pos]
-        return content.strip()
+def _find_marker_entry(mm, marker, marker_bytes, search_end):
+    """
+    メモリマップ上で marker を含む assistant テキスト行を末尾側から探す
+
+    tool_result 等に含まれるマーカー（CLAUDE.md の読み込み結果など）は読み飛ばす。
+
+    Args:
+        mm: セッションログのメモリマップ
+        marker: マーカー文字列
+        marker_bytes: マーカーのバイト列
+        search_end: この位置より前を探す
+
+    Returns:
+        tuple: (マーカーのバイト位置, 行頭, 行末) 見つからない場合は None
+    """
+    while search_end > 0:
+        pos = mm.rfind(marker_bytes, 0, search_end)
+        if pos == -1:
+            return None
+
+        line_start = mm.rfind(b"\n", 0, pos) + 1
+        line_end = mm.find(b"\n", pos)
+        if line_end == -1:
+            line_end = len(mm)
+
+        text = _parse_assistant_text(mm[line_start:line_end])
+        if text is not None and marker in text:
+            return pos, line_start, line_end
+        search_end = line_start
+    return None
+
+
+def find_latest_report_mmap(jsonl_path):
+    """
+    セッションログ全体をメモリマップし、最新の SOR/EOR 報告を探す
+
+    生のバイト列に対してマーカーを rfind し、見つかった範囲に重なる行だけをデコードする。
+    直近何件前のメッセージにマーカーがあっても見つけられ、ファイル全体を文字列として読み込まない。
+
+    Args:
+        jsonl_path: .jsonl ファイルのパス
+
+    Returns:
+        tuple: (報告本文, SOR を含むエントリのオフセット)
+               報告が見つからない場合は (None, NO_OFFSET)
+    """
+    with open(jsonl_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None, NO_OFFSET
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            eor = _find_marker_entry(mm, EOR_MARKER, EOR_MARKER_BYTES, len(mm))
+            if eor is None:
+                return None, NO_OFFSET
+            eor_pos, _, span_end = eor
+
+            # SOR は EOR より前にあるもの（同じ行の中も含む）
+            sor = _find_marker_entry(mm, SOR_MARKER, SOR_MARKER_BYTES, eor_pos)
+            if sor is None:
+                return None, NO_OFFSET
+            _, span_start, _ = sor
+
+            # SOR〜EOR の範囲に重なる行だけをデコード
+            entries = []
+            pos = span_start
+            while pos < span_end:
+                line_end = mm.find(b"\n", pos, span_end)
+                if line_end == -1:
+                    line_end = span_end
+                text = _parse_assistant_text(mm[pos:line_end])
+                if text is not None:
+                    entries.append((pos, text))
+                pos = line_end + 1
+
+    combined_text = "\n".join(text for _, text in entries)
+    eor_pos = combined_text.rfind(EOR_MARKER)
+    sor_pos = combined_text.rfind(SOR_MARKER, 0, eor_pos) if eor_pos != -1 else -1
+    if sor_pos == -1:
+        return None, NO_OFFSET
+
+    # マーカー間を抽出（マーカー行自体は除去）
+    content = combined_text[sor_pos + len(SOR_MARKER):eor_pos]
+    return content.strip(), entries[0][0]
+
+
+def _extract_latest_message_full(jsonl_path):
+    """
+    セッション全体から最新の SOR/EOR 報告を探し、なければ最新1件を返す
+
+    Args:
+        jsonl_path: .jsonl ファイルのパス
+
+    Returns:
+        str: 報告本文または assistant の最新メッセージ（見つからない場合は None）
+    """
+    try:
+        message, _ = find_latest_report_mmap(jsonl_path)
+    except (OSError, ValueError):
+        message = None
+    if message:
+        return message
 
     # フォールバック：従来方式（最新1件）
-    return recent_messages[-1]
+    recent_messages = _collect_recent_assistant_texts(jsonl_path, count=RECENT_MESSAGE_COUNT)
+    return recent_messages[-1] if recent_messages else None
+
+
+def _read_entries_from(jsonl_path, offset):
+    """指定オフセット以降の assistant テキストをすべて読む"""
+    entries = []
+    for line_offset, line, _ in iter_lines_from(jsonl_path, offset):
+        raise_if_cancelled()
+        text = _parse_assistant_text(line)
+        if text is not None:
+            entries.append((line_offset, text))
+    return entries
+
+
+def _extract_latest_message_indexed(jsonl_path, index):
+    """
+    永続インデックスを使って assistant の最新メッセージを抽出
+
+    サイズと mtime が記録時のままなら、記録済みオフセットから末尾までだけを読む。
+    変更があったファイルは通常どおり走査し、結果をインデックスに記録する。
+
+    Args:
+        jsonl_path: .jsonl ファイルのパス
+        index: SessionIndex（None の場合はインデックスを使わない）
+
+    Returns:
+        str: assistant の最新メッセージ（見つからない場合は None）
+    """
+    if index is None:
+        return extract_latest_assistant_message(jsonl_path)
+
+    try:
+        # 走査前に stat を取る（走査中の追記は次回の変更として拾う）
+        stat = os.stat(jsonl_path)
+    except OSError:
+        return None
 
+    record = index.lookup(jsonl_path, stat)
+    if record is not None:
+        text_offset, report_offset = record
+        if text_offset == NO_OFFSET:
+            return None
 
-def format_report_text(raw_text):
+        start = report_offset if report_offset != NO_OFFSET else text_offset
+        try:
+            message, _ = _extract_report_from_entries(_read_entries_from(jsonl_path, start))
+        except ReportCancelled:
+            raise
+        except Exception:
+            message = None
+        if message:
+            return message
+        # 記録と中身が食い違う場合は走査し直す
+
+    try:
+        entries = _collect_recent_assistant_entries(jsonl_path, count=RECENT_MESSAGE_COUNT)
+    except ReportCancelled:
+        raise
+    except Exception:
+        return None
+
+    message, report_offset = _extract_report_from_entries(entries)
+    text_offset = entries[-1][0] if entries else NO_OFFSET
+    try:
+        index.update(jsonl_path, stat, text_offset, report_offset)
+    except Exception as e:
+        print(f"[DEBUG] Failed to update session index: {e}")
+    return message
+
+
+# メッセージ境界インデックスの保持上限（超えたら古いものから破棄）
+MAX_MESSAGE_INDEXES = 16
+
+# assistant テキストエントリ1件分の位置情報
+# markers は本文中の SOR/EOR を出現順に並べた (マーカー, 文字位置) のタプル
+MessageRecord = namedtuple(
+    "MessageRecord", "offset length uuid parent_uuid timestamp text_length markers"
+)
+
+# セッションログごとのメッセージ境界インデックス（パス文字列 → _SessionCursor）
+_message_indexes = OrderedDict()
+_message_index_lock = threading.Lock()
+
+
+def _extend_message_index(jsonl_path, cursor):
+    """前回の解析済み位置以降を1回だけ順方向に読み、assistant テキストの位置を追加する"""
+    for offset, line, terminated in iter_lines_from(jsonl_path, cursor.offset):
+        raise_if_cancelled()
+        # 書き込み途中の末尾行は少し待ち、完結しなければ解析済みにしない
+        if not terminated and not _is_complete_json_line(line):
+            completed = _complete_partial_line(jsonl_path, offset, line)
+            if completed is None:
+                break
+            line, terminated = completed
+
+        parsed = _parse_assistant_entry(line)
+        if parsed is not None:
+            entry, text = parsed
+            cursor.entries.append(MessageRecord(
+                offset, len(line), entry.get("uuid"), entry.get("parentUuid"),
+                entry.get("timestamp"), len(text), _find_markers(text)
+            ))
+        cursor.offset = offset + len(line) + (1 if terminated else 0)
+
+
+def get_message_records(jsonl_path):
     """
-    報告テキストを整形（現在は何もしない、将来の拡張用）
+    セッションログ内の assistant テキストエントリの位置一覧を取得
+
+    初回はファイル全体を1回走査し、2回目以降は追記された部分だけを走査する。
+    ファイルが縮んだ・置き換えられた場合は作り直す。
+
+    Args:
+        jsonl_path: .jsonl ファイルのパス
+
+    Returns:
+        list[MessageRecord]: 位置情報のリスト（古い順）
+    """
+    key = str(jsonl_path)
+    stat = os.stat(jsonl_path)
+
+    # _collect_recent_assistant_entries と同じく、lock はインデックスの出し入れだけに使う
+    with _message_index_lock:
+        cursor = _message_indexes.pop(key, None)
+
+    if cursor is not None and cursor.is_same_file(stat):
+        if (not cursor.is_unchanged(stat)
+                and _read_signature(jsonl_path, cursor.offset) != cursor.signature):
+            cursor = None
+    else:
+        cursor = None
+
+    fresh = cursor is None
+    if fresh:
+        cursor = _SessionCursor(stat, 0, b"", [])
+    if fresh or not cursor.is_unchanged(stat):
+        _extend_message_index(jsonl_path, cursor)
+        cursor.size = stat.st_size
+        cursor.mtime_ns = stat.st_mtime_ns
+        cursor.signature = _read_signature(jsonl_path, cursor.offset)
+    records = list(cursor.entries)
+
+    with _message_index_lock:
+        _message_indexes[key] = cursor
+        while len(_message_indexes) > MAX_MESSAGE_INDEXES:
+            _message_indexes.popitem(last=False)
+
+    return records
+
+
+def _read_record_texts(jsonl_path, records):
+    """位置情報が指す行だけをシークして読み、assistant テキストを返す"""
+    texts = []
+    with open(jsonl_path, 'rb') as f:
+        for record in records:
+            f.seek(record.offset)
+            text = _parse_assistant_text(f.read(record.length))
+            if text is None:
+                # インデックスと中身が食い違う（書き換えられた）
+                raise ValueError(f"stale message index: {jsonl_path}")
+            texts.append(text)
+    return texts
+
+
+# 1件の報告として溜め込む最大文字数（EOR のない SOR で際限なく溜めないため）
+MAX_STREAM_REPORT_CHARS = 16 * 1024 * 1024
+
+
+def _find_markers(text):
+    """本文中の SOR/EOR を先頭から順に探し、(マーカー, 文字位置) のタプルで返す"""
+    markers = []
+    pos = 0
+    while True:
+        sor_pos = text.find(SOR_MARKER, pos)
+        eor_pos = text.find(EOR_MARKER, pos)
+        if sor_pos != -1 and (eor_pos == -1 or sor_pos < eor_pos):
+            markers.append((SOR_MARKER, sor_pos))
+            pos = sor_pos + len(SOR_MARKER)
+        elif eor_pos != -1:
+            markers.append((EOR_MARKER, eor_pos))
+            pos = eor_pos + len(EOR_MARKER)
+        else:
+            return tuple(markers)
+
+
+class _ReportScanner:
+    """
+    エントリを古い順に受け取り、SOR/EOR の対応から報告の範囲を決める
+
+    iter_session_reports（前方走査）と _report_spans（メッセージ境界インデックス）の
+    両方がこれを使い、N件前の報告と全件走査の結果が食い違わないようにする。
+    """
+
+    def __init__(self):
+        self.start = None   # 組み立て中の報告の開始位置 (エントリのキー, SOR 直後の文字位置)
+        self.length = 0     # 組み立て中の報告の文字数（エントリ間の改行を含む）
+
+    def feed(self, key, text_length, markers):
+        """
+        1エントリ分のマーカーを与える
+
+        Returns:
+            list[tuple]: このエントリで閉じた報告の ((開始キー, 開始位置), (終了キー, EOR 位置))
+        """
+        completed = []
+        # メッセージは改行で連結して扱う（直近5件を結合する従来方式と同じ）
+        if self.start is not None:
+            self.length += 1
+        pos = 0
+        for marker, marker_pos in markers:
+            if marker == SOR_MARKER:
+                # EOR より前に新しい SOR があれば、そこから組み立て直す
+                pos = marker_pos + len(SOR_MARKER)
+                self.start = (key, pos)
+                self.length = 0
+            elif self.start is not None:
+                completed.append((self.start, (key, marker_pos)))
+                self.start = None
+        if self.start is not None:
+            self.length += text_length - pos
+            if self.length > MAX_STREAM_REPORT_CHARS:
+                self.start = None
+        return completed
+
+
+def _join_report(texts, start_pos, end_pos):
+    """報告の範囲にあるエントリ本文（古い順）から報告本文を切り出す"""
+    if len(texts) == 1:
+        return texts[0][start_pos:end_pos].strip()
+    parts = [texts[0][start_pos:]] + list(texts[1:-1]) + [texts[-1][:end_pos]]
+    return "\n".join(parts).strip()
+
+
+def _report_spans(records):
+    """
+    SOR/EOR 報告を構成するエントリ範囲を新しい順に返す
+
+    Returns:
+        list[tuple]: ((開始エントリの添字, 開始位置), (終了エントリの添字, EOR 位置)) のリスト
+    """
+    scanner = _ReportScanner()
+    spans = []
+    for i, record in enumerate(records):
+        if record.markers or scanner.start is not None:
+            spans.extend(scanner.feed(i, record.text_length, record.markers))
+    spans.reverse()
+    return spans
+
+
+def get_previous_assistant_message(jsonl_path, back=0):
+    """
+    N件前の assistant テキストを取得（0 が最新）
+
+    Args:
+        jsonl_path: .jsonl ファイルのパス
+        back: 何件さかのぼるか
+
+    Returns:
+        str: assistant テキスト（足りない場合は None）
+    """
+    records = get_message_records(jsonl_path)
+    if back < 0 or back >= len(records):
+        return None
+    return _read_record_texts(jsonl_path, [records[-1 - back]])[0]
+
+
+def _get_previous_report(jsonl_path, back):
+    """
+    セッションログ内で N件前の SOR/EOR 報告を取得（0 が最新）
+
+    Returns:
+        tuple: (報告本文 or None, このファイル内の報告数)
+    """
+    records = get_message_records(jsonl_path)
+    spans = _report_spans(records)
+    if back >= len(spans):
+        return None, len(spans)
+
+    (start, start_pos), (end, end_pos) = spans[back]
+    texts = _read_record_texts(jsonl_path, records[start:end + 1])
+    return _join_report(texts, start_pos, end_pos), len(spans)
+
+
+def get_previous_report(jsonl_path, back=0):
+    """
+    N件前の SOR/EOR 報告を取得（0 が最新）
+
+    Args:
+        jsonl_path: .jsonl ファイルのパス
+        back: 何件さかのぼるか
+
+    Returns:
+        str: 報告本文（足りない場合は None）
+    """
+    if back < 0:
+        return None
+    message, _ = _get_previous_report(jsonl_path, back)
+    return message
+
+
+def iter_session_reports(jsonl_path):
+    """
+    セッションログを先頭から1回だけ走査し、SOR/EOR 報告をすべて返す
+
+    メモリ使用量は最長行 + 組み立て中の報告1件分で頭打ちになる。
+
+    Args:
+        jsonl_path: .jsonl ファイルのパス
+
+    Yields:
+        tuple: (セッションID, EOR を含むエントリのタイムスタンプ, 報告本文)
+    """
+    session_id = Path(jsonl_path).stem
+    scanner = _ReportScanner()
+    held = []           # 組み立て中の報告にかかるエントリ本文（古い順）
+
+    for _, line, _ in iter_lines_from(jsonl_path):
+        parsed = _parse_assistant_entry(line)
+        if parsed is None:
+            continue
+        entry, text = parsed
+
+        markers = _find_markers(text)
+        if not markers and scanner.start is None:
+            continue
+        index = len(held)
+        held.append(text)
+        for (start, start_pos), (end, end_pos) in scanner.feed(index, len(text), markers):
+            yield (
+                entry.get("sessionId") or session_id,
+                entry.get("timestamp", ""),
+                _join_report(held[start:end + 1], start_pos, end_pos)
+            )
+
+        # 組み立て中の報告より前のエントリは捨て、開始位置を詰め直す
+        if scanner.start is None:
+            held = []
+        else:
+            start, start_pos = scanner.start
+            del held[:start]
+            scanner.start = (0, start_pos)
+
+
+def iter_reports(project_path, max_workers=4, queue_size=256):
+    """
+    プロジェクトの全セッションログから SOR/EOR 報告をすべて返す
+
+    各ファイルはスレッドプール上で1回ずつ前方走査し、報告はできた順に流す。
+    呼び出し側が途中で止めると、残りのファイルの走査も打ち切る。
+
+    Args:
+        project_path: プロジェクトのパス
+        max_workers: 同時に走査するファイル数
+        queue_size: 受け渡し待ちの報告の上限（これを超えると走査側が待つ）
+
+    Yields:
+        tuple: (セッションID, タイムスタンプ, 報告本文)（ファイル内では古い順）
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import queue
+
+    log_dir = get_log_dir(project_path)
+    if not log_dir:
+        return
+    jsonl_files = find_session_logs_by_mtime(log_dir)
+    if not jsonl_files:
+        return
+
+    results = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    done_marker = object()
+
+    def put(item):
+        # 受け取り側が止まっても抜けられるよう、停止フラグを見ながら待つ
+        while not stop_event.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def scan(jsonl_file):
+        try:
+            for report in iter_session_reports(jsonl_file):
+                if not put(report):
+                    return
+        except Exception as e:
+            print(f"[DEBUG] iter_reports failed on {jsonl_file}: {e}")
+        finally:
+            put(done_marker)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for jsonl_file in jsonl_files:
+            executor.submit(scan, jsonl_file)
+
+        remaining = len(jsonl_files)
+        while remaining:
+            item = results.get()
+            if item is done_marker:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def import_reports(project_path, history, prefix=""):
+    """
+    プロジェクトの全 SOR/EOR 報告を CC→GPT 履歴に一括で取り込む
+
+    CopyHistory は新しい MAX_ENTRIES 件までしか残さないので、全件を残すには SQLiteHistory に取り込む
+    （bridgiron_cli.py import の既定）。
+
+    Args:
+        project_path: プロジェクトのパス
+        history: SQLiteHistory または CopyHistory
+        prefix: 報告の先頭に付ける枕文
+
+    Returns:
+        int: 追加した件数
+    """
+    entries = (
+        (timestamp, prefix + text)
+        for _, timestamp, text in iter_reports(project_path)
+        if text
+    )
+    return history.import_entries("cc_to_gpt", entries, prefix_to_remove=prefix)
+
+
+def format_report_text(raw_text, stats=None):
+    """
+    報告テキストを整形（report_format の既定パイプラインを通す）
 
     Args:
         raw_text: 生のテキスト
+        stats: dict を渡すと、整形前後のバイト数と各ステージの所要時間を書き込む
 
     Returns:
         str: 整形後のテキスト
     """
-    # 現在は整形処理なし（そのまま返す）
-    return raw_text
+    return get_default_pipeline().run(raw_text, stats)
+
+
+# 報告キャッシュの上限（件数・合計バイト数）
+REPORT_CACHE_MAX_ENTRIES = 128
+REPORT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class _ReportCache:
+    """セッションログごとの整形済み報告の LRU キャッシュ"""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()   # キー → (整形済み報告 or None, バイト数)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns:
+            tuple: (ヒットしたか, 整形済み報告 or None)
+        """
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                self.misses += 1
+                return False, None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, item[0]
+
+    def put(self, key, report):
+        with self.lock:
+            size = len(report.encode('utf-8')) if report else 0
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self.entries[key] = (report, size)
+            self.total_bytes += size
+
+            # 件数・合計バイト数の上限を超えたら古いものから捨てる
+            while self.entries and (len(self.entries) > self.max_entries
+                                    or self.total_bytes > self.max_bytes):
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+            }
+
+
+_report_cache = _ReportCache(REPORT_CACHE_MAX_ENTRIES, REPORT_CACHE_MAX_BYTES)
+
+
+def get_report_cache_stats():
+    """
+    報告キャッシュの統計を取得
+
+    Returns:
+        dict: hits / misses / entries / bytes
+    """
+    return _report_cache.stats()
+
+
+def clear_report_cache():
+    """報告キャッシュを空にする"""
+    _report_cache.clear()
 
 
-def get_cc_report(project_path):
+def _report_cache_key(jsonl_path, stat, full_search):
+    """ファイルの同一性とサイズ・mtime_ns、整形ステージの構成からキャッシュキーを作る"""
+    return (str(jsonl_path), stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, full_search,
+            get_default_pipeline().stage_names)
+
+
+def get_cc_report(project_path, full_search=False, cancel_event=None, back=0, format_stats=None,
+                  token_budget=0):
     """
     CC報告を取得するメイン関数
 
     Args:
         project_path: プロジェクトのパス
+        full_search: True ならセッション全体をメモリマップして SOR/EOR を探す
+                     （False なら直近5件の assistant テキストから探す）
+        cancel_event: threading.Event（セットされると ReportCancelled を送出して中断する）
+        back: 1以上なら、その件数だけさかのぼった SOR/EOR 報告を返す
+              （メッセージ境界インデックスを使い、古いセッションログにもまたがって数える）
+        format_stats: dict を渡すと整形の統計を書き込む（format_report_text を参照）
+                      キャッシュから返した場合は {"cached": True}
+                      token_budget を指定した場合は tokens_before / tokens_after / dropped も書き込む
+        token_budget: 1以上なら、報告をこのトークン数に収まるよう優先度の低い部分から落とす
 
     Returns:
         tuple: (成功フラグ, メッセージまたはエラーコード)
@@ -167,21 +1136,225 @@ def get_cc_report(project_path):
             失敗時: (False, エラーコード)
             エラーコード: "no_project", "no_log", "no_report"
     """
+    with cancellation(cancel_event):
+        if back > 0:
+            success, result, _ = _get_previous_cc_report(project_path, back, format_stats)
+        else:
+            success, result, _ = _get_cc_report(project_path, full_search, format_stats)
+        if success and token_budget > 0:
+            result, dropped, tokens_before, tokens_after = compact_report(result, token_budget)
+            if dropped:
+                print(f"[DEBUG] Report compacted: {tokens_before} -> {tokens_after} tokens, dropped {dropped}")
+            if format_stats is not None:
+                format_stats.update(tokens_before=tokens_before, tokens_after=tokens_after, dropped=dropped)
+        return (success, result)
+
+
+def _get_cc_report(project_path, full_search, format_stats=None):
+    """
+    get_cc_report の本体
+
+    Returns:
+        tuple: (成功フラグ, メッセージまたはエラーコード, 報告を含むログの mtime_ns or None)
+    """
     # 1. ログディレクトリ取得
     log_dir = get_log_dir(project_path)
     if not log_dir:
-        return (False, "no_log")
+        return (False, "no_log", None)
 
-    # 2. mtime 順に .jsonl ファイルを取得
-    jsonl_files = find_session_logs_by_mtime(log_dir)
-    if not jsonl_files:
-        return (False, "no_log")
+    # 2. mtime 順に .jsonl ファイルを新しいものから順に試し、text が取れたら返す
+    #    （変更のないファイルはインデックスで省略、見つかった時点で列挙も打ち切る）
+    index = get_session_index()
+    found_log = False
+    for jsonl_file in iter_session_logs_by_mtime(log_dir):
+        raise_if_cancelled()
+        found_log = True
 
-    # 3. 順番に試して、text が取れたら返す
-    for jsonl_file in jsonl_files:
-        message = extract_latest_assistant_message(jsonl_file)
-        if message:
-            formatted = format_report_text(message)
-            return (True, formatted)
+        # 前回から変わっていないファイルは、整形済みの結果をそのまま使う
+        try:
+            stat = os.stat(jsonl_file)
+        except OSError:
+            continue
+        cache_key = _report_cache_key(jsonl_file, stat, full_search)
+        hit, formatted = _report_cache.get(cache_key)
+        if hit:
+            print(f"[DEBUG] Report cache hit: {jsonl_file.name} {_report_cache.stats()}")
+            if format_stats is not None:
+                format_stats["cached"] = True
+        else:
+            if full_search:
+                message = _extract_latest_message_full(jsonl_file)
+            else:
+                message = _extract_latest_message_indexed(jsonl_file, index)
+            formatted = format_report_text(message, format_stats) if message else None
+            _report_cache.put(cache_key, formatted)
+
+        if formatted:
+            return (True, formatted, stat.st_mtime_ns)
+
+    if not found_log:
+        return (False, "no_log", None)
+    return (False, "no_report", None)
+
+
+def _get_previous_cc_report(project_path, back, format_stats=None):
+    """
+    新しいセッションログから順に報告を数え、back 件さかのぼった報告を返す
+
+    Returns:
+        tuple: _get_cc_report と同じ
+    """
+    log_dir = get_log_dir(project_path)
+    if not log_dir:
+        return (False, "no_log", None)
+
+    found_log = False
+    for jsonl_file in iter_session_logs_by_mtime(log_dir):
+        raise_if_cancelled()
+        found_log = True
+        try:
+            mtime_ns = os.stat(jsonl_file).st_mtime_ns
+            message, count = _get_previous_report(jsonl_file, back)
+        except ReportCancelled:
+            raise
+        except (OSError, ValueError) as e:
+            print(f"[DEBUG] Message index error: {jsonl_file.name}: {e}")
+            continue
+        if back < count:
+            if message:
+                return (True, format_report_text(message, format_stats), mtime_ns)
+            break
+        back -= count
+
+    if not found_log:
+        return (False, "no_log", None)
+    return (False, "no_report", None)
+
+
+def get_cc_reports(project_paths, full_search=False, cancel_event=None, max_workers=8,
+                   partial_line_wait=0.0):
+    """
+    複数プロジェクトの CC報告をスレッドプールで並列に取得する
+
+    ファイルごとの報告キャッシュとインデックスは get_cc_report と共有するので、
+    変更のないプロジェクトはほぼ stat だけで済む。
+    一覧の更新が書き込み中の1プロジェクトに引きずられないよう、既定では末尾行の完成を待たない
+    （そのプロジェクトは完成済みの最後の報告を返し、次の更新で新しい報告を拾う）。
+
+    Args:
+        project_paths: プロジェクトパスのリスト
+        full_search: get_cc_report と同じ
+        cancel_event: threading.Event（セットされると ReportCancelled を送出して中断する）
+        max_workers: 同時に走査するプロジェクト数
+        partial_line_wait: 書き込み途中の末尾行の完成を待つ秒数（None なら PARTIAL_LINE_WAIT_SEC）
+
+    Returns:
+        list: (プロジェクトパス, 成功フラグ, メッセージまたはエラーコード, mtime_ns or None) のリスト
+              （報告の新しい順、取得できなかったプロジェクトは末尾）
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    # 重複を除いて順序を保つ
+    project_paths = list(dict.fromkeys(p for p in project_paths if p))
+    if not project_paths:
+        return []
+
+    def collect(project_path):
+        _cancel_state.event = cancel_event
+        _cancel_state.partial_line_wait = partial_line_wait
+        try:
+            return (project_path,) + _get_cc_report(project_path, full_search)
+        except ReportCancelled:
+            raise
+        except Exception as e:
+            print(f"[DEBUG] CC report failed for {project_path}: {e}")
+            return (project_path, False, "no_report", None)
+        finally:
+            _cancel_state.event = None
+            _cancel_state.partial_line_wait = None
+
+    workers = max(1, min(max_workers, len(project_paths)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cc_reports") as executor:
+        results = list(executor.map(collect, project_paths))
+
+    # 報告のあるものを新しい順に、ないものは指定順のまま後ろに並べる
+    results.sort(key=lambda r: (r[3] is None, -(r[3] or 0)))
+    return results
+
+
+class ReportExecutor:
+    """
+    get_cc_report をワーカースレッドで実行する
+
+    結果は (チケット番号, (成功フラグ, メッセージまたはエラーコード)) として
+    result_queue に入る（Tk 側は root.after でこのキューを見に行く）。
+    新しい要求を出すと、実行中・待機中の古い要求は取り消される。
+    func には get_cc_reports のように cancel_event を受け取る関数も指定できる。
+    """
+
+    def __init__(self, result_queue, func=None):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.results = result_queue
+        self.func = func or get_cc_report
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cc_report")
+        self.lock = threading.Lock()
+        self.last_ticket = 0
+        self.current = None     # (チケット番号, 取り消しフラグ, Future)
+
+    def submit(self, project_path, **kwargs):
+        """
+        CC報告の取得を要求する
+
+        Args:
+            project_path: プロジェクトのパス（get_cc_reports ならパスのリスト）
+            **kwargs: func に渡す追加の引数
+
+        Returns:
+            int: この要求のチケット番号
+        """
+        with self.lock:
+            self._cancel_current()
+            self.last_ticket += 1
+            ticket = self.last_ticket
+            cancel_event = threading.Event()
+            future = self.executor.submit(self._run, ticket, cancel_event, project_path, kwargs)
+            self.current = (ticket, cancel_event, future)
+            return ticket
+
+    def cancel(self, ticket=None):
+        """
+        実行中の要求を取り消す
+
+        Args:
+            ticket: 取り消すチケット番号（None なら現在の要求）
+        """
+        with self.lock:
+            if self.current and (ticket is None or self.current[0] == ticket):
+                self._cancel_current()
+
+    def _cancel_current(self):
+        if self.current:
+            _, cancel_event, future = self.current
+            cancel_event.set()
+            future.cancel()
+            self.current = None
+
+    def _run(self, ticket, cancel_event, project_path, kwargs):
+        """ワーカースレッドで func を実行し、結果をキューに入れる"""
+        try:
+            result = self.func(project_path, cancel_event=cancel_event, **kwargs)
+        except ReportCancelled:
+            print(f"[DEBUG] CC report request {ticket} cancelled")
+            return
+        except Exception as e:
+            print(f"[DEBUG] CC report request {ticket} failed: {e}")
+            result = (False, "no_report")
+
+        if not cancel_event.is_set():
+            self.results.put((ticket, result))
 
-    return (False, "no_report")
+    def shutdown(self):
+        """実行中の要求を取り消してワーカーを止める"""
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
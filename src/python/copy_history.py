@@ -1,43 +1,374 @@
 # -*- coding: utf-8 -*-
 """
 Bridgiron - コピー履歴管理
+
+追加・削除のたびに履歴全体を書き直さないよう、変更は1件1行の JSON として
+ジャーナル（copy_history.json.journal）に追記する。読み込み時は本体に
+ジャーナルを順に適用し、ジャーナルが大きくなったら本体に書き出して空にする（圧縮）。
+各レコードには通し番号を付け、本体には反映済みの番号を保存するので、
+圧縮の途中で落ちても同じレコードを二重に適用しない。
+
+ファイルへの書き込みは HistoryWriter がバックグラウンドのスレッドでまとめて行う
+（add / delete はメモリ上の履歴を更新してレコードを溜めるだけで戻る）。
+
+全文は BlobStore（copy_history.pack）に内容ハッシュをキーにした圧縮 blob として置き、
+エントリには枕文と本文それぞれのキーだけを持つ。同じ内容・同じ枕文は1回しか保存されず、
+全文は get_content で選ばれたときだけパックから読んで展開する。起動時に読むのは
+プレビューとキーだけの本体なので、起動時間とメモリは全文の量によらない。
 """
 
 import json
+import os
 import threading
 import time
 from datetime import datetime
 from pathlib import Path
 import pyperclip
+from blob_store import BlobStore, blob_key
+
+# 変更が止んでから書き込むまでの待ち時間と、変更が続いていても書き込む最大の遅延（秒）
+HISTORY_WRITE_DELAY = 0.5
+HISTORY_WRITE_MAX_DELAY = 2.0
+
+
+class HistoryWriter:
+    """
+    変更をまとめて書き込むバックグラウンドのスレッド（write-behind）
+
+    mark_dirty() が続いている間は待ち、止んでから delay 秒後（続いていても max_delay 秒後）に
+    flush_func を1回だけ呼ぶ。落ちた場合に失われるのは、この待ち時間の間の変更だけ。
+    """
+
+    def __init__(self, flush_func, delay=HISTORY_WRITE_DELAY, max_delay=HISTORY_WRITE_MAX_DELAY):
+        self.flush_func = flush_func
+        self.delay = delay
+        self.max_delay = max_delay
+        self.cond = threading.Condition()
+        self.dirty_since = None   # 未書き込みの最初の変更の時刻
+        self.last_change = None   # 最後の変更の時刻
+        self.running = False
+        self.thread = None
+        self.flush_lock = threading.Lock()
+
+    def mark_dirty(self):
+        """未書き込みの変更があることを知らせる（初回にスレッドを起動）"""
+        with self.cond:
+            now = time.monotonic()
+            if self.dirty_since is None:
+                self.dirty_since = now
+            self.last_change = now
+            if not self.running:
+                self.running = True
+                self.thread = threading.Thread(target=self._write_loop, daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def flush(self):
+        """溜まっている変更を今すぐ書き込む（呼び出し元のスレッドで実行）"""
+        with self.cond:
+            self.dirty_since = None
+            self.last_change = None
+        with self.flush_lock:
+            try:
+                self.flush_func()
+            except Exception as e:
+                print(f"[DEBUG] History write error: {e}")
+
+    def close(self):
+        """スレッドを止めて、残りを書き込む"""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+        self.flush()
+
+    def _write_loop(self):
+        """書き込みループ"""
+        while True:
+            with self.cond:
+                while self.running and self.dirty_since is None:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                now = time.monotonic()
+                # 変更が続いている間は待つ（ただし max_delay を超えたら書き込む）
+                wait = min(self.last_change + self.delay, self.dirty_since + self.max_delay) - now
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue
+            self.flush()
 
 
 class CopyHistory:
     MAX_ENTRIES = 50
     PREVIEW_LENGTH = 30
+    CATEGORIES = ("gpt_to_cc", "cc_to_gpt")
 
-    def __init__(self, history_file: Path):
+    # ジャーナルがこのバイト数と本体のサイズの両方を超えたら圧縮する
+    JOURNAL_COMPACT_MIN_BYTES = 256 * 1024
+
+    def __init__(self, history_file: Path, codec: str = "zlib", known_prefixes=(), read_only: bool = False):
+        """
+        Args:
+            history_file: 履歴本体のパス（ジャーナルと blob はその隣に置く）
+            codec: 新しく書く blob の圧縮方式（"zlib" / "lzma"）
+            known_prefixes: 旧形式のエントリを移すときに本文から切り離す枕文
+            read_only: True ならファイルに一切書き込まない（旧形式のエントリもそのまま読む。
+                       SQLite への移行用で、add / delete は使えない）
+        """
         self.history_file = history_file
+        self.known_prefixes = [prefix for prefix in known_prefixes if prefix]
+        self.read_only = read_only
+        self.journal_file = history_file.with_name(history_file.name + '.journal')
+        self.blobs = BlobStore(history_file.with_suffix('.pack'), codec, read_only=read_only)
+        self.seq = 0               # 最後に適用したレコードの通し番号
+        self.journal_bytes = 0     # ジャーナルの有効なバイト数
+        self.snapshot_bytes = 0    # 本体のバイト数
+        self.lock = threading.RLock()   # data・seq・pending を守る
+        self.pending = []          # 未書き込みのジャーナル行（bytes）
+        self.save_requested = False
         self.data = self._load()
+        self.writer = HistoryWriter(self.flush)
+        if self.save_requested:
+            self.writer.mark_dirty()
 
     def _load(self):
-        """履歴ファイルを読み込み"""
+        """履歴ファイルを読み込み、ジャーナルを適用"""
+        data = None
         if self.history_file.exists():
             try:
                 with open(self.history_file, 'r', encoding='utf-8-sig') as f:
-                    return json.load(f)
+                    data = json.load(f)
+                self.snapshot_bytes = self.history_file.stat().st_size
             except:
-                pass
-        return {"gpt_to_cc": [], "cc_to_gpt": []}
+                data = None
+        if not isinstance(data, dict):
+            data = {}
+        self.seq = data.pop("seq", 0)
+        for category in self.CATEGORIES:
+            data.setdefault(category, [])
+
+        self._replay_journal(data)
+
+        # 全文を直接持つ旧形式のエントリは blob に移す（既知の枕文で始まるものは枕文を切り離す）
+        converted = 0
+        for category in self.CATEGORIES:
+            for i, entry in enumerate(data[category]):
+                if "content" in entry and not self.read_only:
+                    prefix = next((p for p in self.known_prefixes if entry["content"].startswith(p)), "")
+                    data[category][i] = self._to_stored(entry, prefix)
+                    converted += 1
+        if converted:
+            print(f"[DEBUG] History: moved {converted} entries to blobs")
+            self.save_requested = True
+        return data
+
+    def _replay_journal(self, data):
+        """
+        ジャーナルのレコードを data に順に適用する
+
+        書き込み途中で落ちた末尾のレコード（改行で終わっていない・JSON として壊れている）は
+        捨て、ジャーナルをその手前で切り詰める。
+        """
+        try:
+            with open(self.journal_file, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"[DEBUG] History journal read error: {e}")
+            return
+
+        pos = 0
+        applied = 0
+        while pos < len(raw):
+            end = raw.find(b'\n', pos)
+            if end == -1:
+                break
+            try:
+                record = json.loads(raw[pos:end])
+                seq = record["seq"]
+            except (ValueError, KeyError, TypeError):
+                break
+            # 本体に反映済みのレコード（圧縮の途中で落ちた場合）は飛ばす
+            if seq > self.seq:
+                self._apply(data, record)
+                self.seq = seq
+                applied += 1
+            pos = end + 1
+
+        self.journal_bytes = pos
+        if pos < len(raw) and not self.read_only:
+            print(f"[DEBUG] History journal: dropping {len(raw) - pos} bytes of a truncated record")
+            try:
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(pos)
+            except OSError as e:
+                print(f"[DEBUG] History journal truncate error: {e}")
+        print(f"[DEBUG] History journal: replayed {applied} records")
+
+    def _apply(self, data, record):
+        """ジャーナルのレコード1件を data に適用"""
+        entries = data[record["category"]]
+        if record["op"] == "add":
+            entries.insert(0, record["entry"])
+            del entries[self.MAX_ENTRIES:]
+        elif record["op"] == "delete":
+            index = record["index"]
+            if 0 <= index < len(entries):
+                del entries[index]
+
+    def _append(self, record: dict):
+        """レコードを通し番号付きで書き込み待ちに入れる（lock を保持して呼ぶ）"""
+        if self.read_only:
+            raise RuntimeError("the copy history is opened read-only")
+        self.seq += 1
+        record["seq"] = self.seq
+        self.pending.append((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+        self.writer.mark_dirty()
+
+    def _request_save(self):
+        """履歴全体の書き出しを要求する（lock を保持して呼ぶ）"""
+        if self.read_only:
+            raise RuntimeError("the copy history is opened read-only")
+        self.save_requested = True
+        self.writer.mark_dirty()
+
+    def flush(self):
+        """
+        書き込み待ちのレコードをジャーナルにまとめて追記し、大きくなっていれば圧縮する
+
+        HistoryWriter のスレッドから呼ばれる（終了時は close() から呼び出し元のスレッドで）。
+        """
+        with self.lock:
+            lines = self.pending
+            self.pending = []
+            save = self.save_requested
+
+        # レコードが参照する blob を先に書く（書けなければレコードも書かずに次回に回す）
+        try:
+            self.blobs.flush()
+        except OSError as e:
+            print(f"[DEBUG] Blob write error: {e}")
+            with self.lock:
+                self.pending = lines + self.pending
+                self.writer.mark_dirty()
+            return
+
+        if lines and not save:
+            try:
+                with open(self.journal_file, 'ab') as f:
+                    # 前回途中まで書いたレコードがあれば、その手前から書く
+                    if f.tell() != self.journal_bytes:
+                        f.truncate(self.journal_bytes)
+                        f.seek(self.journal_bytes)
+                    f.write(b''.join(lines))
+                self.journal_bytes += sum(len(line) for line in lines)
+            except OSError as e:
+                print(f"[DEBUG] History journal write error: {e}")
+                save = True
+
+        if save or self.journal_bytes > max(self.JOURNAL_COMPACT_MIN_BYTES, self.snapshot_bytes):
+            self._save()
+
+    def close(self):
+        """書き込みスレッドを止め、残りを書き込む（アプリ終了時に呼ぶ）"""
+        if not self.read_only:
+            self.writer.close()
 
     def _save(self):
-        """履歴ファイルを保存"""
-        with open(self.history_file, 'w', encoding='utf-8-sig') as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        """履歴全体を本体に書き出し（一時ファイル経由で置き換え）、ジャーナルを空にする"""
+        with self.lock:
+            # 書き込み待ちのレコードも本体に含まれるので、ジャーナルには書かない
+            text = json.dumps(dict(self.data, seq=self.seq), ensure_ascii=False, indent=2)
+            seq = self.seq
+            self.pending = []
+            self.save_requested = False
+            # 参照の集合はこの時点の data から作る（これ以降の追加が参照する blob は消さない）
+            self.blobs.begin_collection()
+            referenced = {key for entries in self.data.values() for entry in entries
+                          for key in (entry.get("prefix"), entry.get("body")) if key}
+
+        self.blobs.flush()
+        temp_file = self.history_file.with_name(self.history_file.name + '.tmp')
+        with open(temp_file, 'w', encoding='utf-8-sig') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.history_file)
+        self.snapshot_bytes = self.history_file.stat().st_size
 
-    def _make_preview(self, content: str) -> str:
-        """プレビュー文字列を生成"""
-        preview = content.replace('\n', ' ').replace('\r', '')
-        return preview[:self.PREVIEW_LENGTH]
+        # 本体に seq まで反映済みなので、ここで落ちてもジャーナルは二重に適用されない
+        with open(self.journal_file, 'wb'):
+            pass
+        self.journal_bytes = 0
+        print(f"[DEBUG] History compacted: {self.snapshot_bytes} bytes, seq={seq}")
+
+        # 本体からもジャーナルからも参照されなくなった blob を消す
+        # （パックの書き直しは時間がかかるので、履歴の lock は持たずに行う）
+        self.blobs.collect_garbage(referenced)
+
+    @classmethod
+    def _make_preview(cls, content: str, start: int = 0) -> str:
+        """
+        プレビュー文字列を生成
+
+        全文ではなく先頭の一部だけを置換する（\r を除いて足りなければ範囲を広げる）。
+
+        Args:
+            content: 全文
+            start: プレビューを始める位置
+        """
+        window = cls.PREVIEW_LENGTH * 2
+        while True:
+            part = content[start:start + window]
+            preview = part.replace('\n', ' ').replace('\r', '')
+            if len(preview) >= cls.PREVIEW_LENGTH or start + window >= len(content):
+                return preview[:cls.PREVIEW_LENGTH]
+            window *= 2
+
+    @classmethod
+    def _make_entry(cls, content: str, prefix_to_remove: str, timestamp: str) -> dict:
+        """履歴エントリを生成"""
+        # プレビューの開始位置（枕文と、その後の改行を飛ばす。全文のコピーは作らない）
+        start = 0
+        if prefix_to_remove and content.startswith(prefix_to_remove):
+            start = len(prefix_to_remove)
+            while start < len(content) and content[start] in '\r\n':
+                start += 1
+
+        return {
+            "timestamp": timestamp,
+            "preview": cls._make_preview(content, start),
+            "content": content  # 全文は枕文込みで保存
+        }
+
+    def _to_stored(self, entry: dict, prefix: str) -> dict:
+        """
+        全文を持つエントリを、枕文と本文を blob に置いてキーだけを持つ形にする（lock を保持して呼ぶ）
+
+        Args:
+            entry: _make_entry が返したエントリ
+            prefix: 全文の先頭にある枕文（なければ ""）
+        """
+        content = entry["content"]
+        stored = {"timestamp": entry["timestamp"], "preview": entry["preview"]}
+        if prefix and content.startswith(prefix):
+            stored["prefix"] = self.blobs.put(prefix)
+            content = content[len(prefix):]
+        stored["body"] = self.blobs.put(content)
+        return stored
+
+    def _entry_content(self, entry: dict) -> str:
+        """エントリの全文（枕文込み）を blob から読む"""
+        if "content" in entry:
+            # 読み取り専用で開いた旧形式のエントリ
+            return entry["content"]
+        prefix_key = entry.get("prefix")
+        prefix = self.blobs.get(prefix_key) if prefix_key else ""
+        return prefix + self.blobs.get(entry["body"])
 
     def add(self, category: str, content: str, prefix_to_remove: str = ""):
         """履歴を追加
@@ -47,43 +378,107 @@ class CopyHistory:
             content: コピーする全文
             prefix_to_remove: プレビューから除去する枕文（オプション）
         """
-        # プレビュー用のコンテンツ（枕文を除去）
-        preview_content = content
-        if prefix_to_remove and content.startswith(prefix_to_remove):
-            preview_content = content[len(prefix_to_remove):].lstrip('\r\n')
+        entry = self._make_entry(content, prefix_to_remove, datetime.now().isoformat())
+        with self.lock:
+            record = {"op": "add", "category": category, "entry": self._to_stored(entry, prefix_to_remove)}
+            self._apply(self.data, record)
+            self._append(record)
 
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "preview": self._make_preview(preview_content),
-            "content": content  # 全文は枕文込みで保存
-        }
-        self.data[category].insert(0, entry)
-        if len(self.data[category]) > self.MAX_ENTRIES:
-            self.data[category] = self.data[category][:self.MAX_ENTRIES]
-        self._save()
-
-    def get_list(self, category: str) -> list:
-        """プレビューリストを取得"""
-        return [
-            {
-                "index": i,
-                "timestamp": entry["timestamp"],
-                "preview": entry["preview"]
-            }
-            for i, entry in enumerate(self.data[category])
-        ]
+    @staticmethod
+    def _to_local_timestamp(timestamp: str) -> str:
+        """ISO 8601 のタイムスタンプ（UTC の Z 付きも可）をローカル時刻の表記に揃える"""
+        try:
+            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        except (ValueError, AttributeError):
+            return datetime.now().isoformat()
+        if dt.tzinfo is not None:
+            dt = dt.astimezone().replace(tzinfo=None)
+        return dt.isoformat()
+
+    def import_entries(self, category: str, entries, prefix_to_remove: str = "") -> int:
+        """履歴を一括で取り込む（既存と同じ内容は除外し、本体の書き出しを1回だけ要求する）
+
+        Args:
+            category: 'gpt_to_cc' or 'cc_to_gpt'
+            entries: (タイムスタンプ, 全文) の iterable
+            prefix_to_remove: プレビューから除去する枕文（オプション）
+
+        Returns:
+            int: 取り込まれて履歴に残った件数
+        """
+        with self.lock:
+            existing = list(self.data[category])
+        known_contents = {blob_key(self._entry_content(entry)) for entry in existing}
+        imported = []
+        for timestamp, content in entries:
+            key = blob_key(content)
+            if key in known_contents:
+                continue
+            known_contents.add(key)
+            imported.append(self._make_entry(content, prefix_to_remove, self._to_local_timestamp(timestamp)))
+
+        if not imported:
+            return 0
+
+        with self.lock:
+            imported = [self._to_stored(entry, prefix_to_remove) for entry in imported]
+            # 新しい順に並べ直して上限件数に切り詰める
+            merged = self.data[category] + imported
+            merged.sort(key=lambda entry: datetime.fromisoformat(entry["timestamp"]), reverse=True)
+            self.data[category] = merged[:self.MAX_ENTRIES]
+            self._request_save()
+
+            kept = {id(entry) for entry in self.data[category]}
+        return sum(1 for entry in imported if id(entry) in kept)
+
+    def get_list(self, category: str, offset: int = 0, limit: int = None) -> list:
+        """プレビューリストを取得（offset / limit で1ページ分だけ取得できる）"""
+        with self.lock:
+            entries = self.data[category]
+            end = len(entries) if limit is None else min(len(entries), offset + limit)
+            return [
+                {
+                    "index": i,
+                    "timestamp": entries[i]["timestamp"],
+                    "preview": entries[i]["preview"]
+                }
+                for i in range(offset, end)
+            ]
 
     def get_content(self, category: str, index: int) -> str:
         """指定インデックスの全文を取得"""
-        if 0 <= index < len(self.data[category]):
-            return self.data[category][index]["content"]
-        return ""
+        with self.lock:
+            if not 0 <= index < len(self.data[category]):
+                return ""
+            entry = self.data[category][index]
+        return self._entry_content(entry)
+
+    def storage_stats(self) -> dict:
+        """
+        保存状況（ディスク上のサイズと、展開した場合の全文のサイズ）
+
+        Returns:
+            dict: entries, snapshot_bytes, journal_bytes, blobs, blob_disk_bytes, blob_raw_bytes
+        """
+        with self.lock:
+            entries = sum(len(entries) for entries in self.data.values())
+        blob_stats = self.blobs.stats()
+        return {
+            "entries": entries,
+            "snapshot_bytes": self.snapshot_bytes,
+            "journal_bytes": self.journal_bytes,
+            "blobs": blob_stats["blobs"],
+            "blob_disk_bytes": blob_stats["disk_bytes"],
+            "blob_raw_bytes": blob_stats["raw_bytes"],
+        }
 
     def delete(self, category: str, index: int):
         """指定インデックスの履歴を削除"""
-        if 0 <= index < len(self.data[category]):
-            del self.data[category][index]
-            self._save()
+        with self.lock:
+            if 0 <= index < len(self.data[category]):
+                record = {"op": "delete", "category": category, "index": index}
+                self._apply(self.data, record)
+                self._append(record)
 
 
 class ClipboardWatcher:
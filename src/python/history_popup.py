@@ -16,6 +16,12 @@ else:
     SCRIPT_DIR = Path(__file__).resolve().parent
     PROJECT_ROOT = SCRIPT_DIR.parent.parent
 
+# 一度に表示する件数（「さらに表示」で次のページを読む）
+PAGE_SIZE = 50
+
+# 検索欄の入力が止まってから検索するまでの時間（ミリ秒）
+SEARCH_DELAY_MS = 200
+
 
 class HistoryPopup(tk.Toplevel):
     def __init__(self, parent, history, category: str, on_select_callback, get_text_func, popup_title: str):
@@ -24,6 +30,9 @@ class HistoryPopup(tk.Toplevel):
         self.category = category
         self.on_select = on_select_callback
         self.get_text = get_text_func
+        self.items = []          # 表示中のアイテム
+        self.query = ""
+        self.search_job = None
 
         # アイコン設定
         try:
@@ -39,6 +48,14 @@ class HistoryPopup(tk.Toplevel):
         self.geometry("400x300")
         self.resizable(False, False)
 
+        # 検索欄（全文検索できる履歴の場合のみ）
+        self.search_entry = None
+        if hasattr(self.history, "search"):
+            self.search_entry = tk.Entry(self, bg='#3c3c3c', fg='white', insertbackground='white',
+                                         relief='flat', font=('Arial', 10))
+            self.search_entry.pack(fill='x', padx=10, pady=(10, 0))
+            self.search_entry.bind('<KeyRelease>', self._on_search_change)
+
         # リストフレーム
         self.list_frame = tk.Frame(self, bg='#2d2d2d')
         self.list_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -104,11 +121,26 @@ class HistoryPopup(tk.Toplevel):
             pass
         super().destroy()
 
+    def _fetch_page(self, offset):
+        """1ページ分のアイテムを取得（次のページがあるか判定するため1件多く読む）"""
+        if self.query:
+            return self.history.search(self.category, self.query, offset, PAGE_SIZE + 1)
+        return self.history.get_list(self.category, offset, PAGE_SIZE + 1)
+
     def _populate_list(self):
         """履歴リストを表示"""
-        items = self.history.get_list(self.category)
+        self.items = []
+        self._append_page()
 
-        if not items:
+    def _append_page(self):
+        """次のページを読み込んで表示"""
+        offset = len(self.items)
+        items = self._fetch_page(offset)
+        has_more = len(items) > PAGE_SIZE
+        items = items[:PAGE_SIZE]
+        self.items.extend(items)
+
+        if not self.items:
             label = tk.Label(
                 self.scrollable_frame,
                 text=self.get_text("no_history"),
@@ -119,7 +151,7 @@ class HistoryPopup(tk.Toplevel):
             label.pack(pady=20)
             return
 
-        for i, item in enumerate(items[:50]):  # 最大50件表示
+        for item in items:
             frame = tk.Frame(self.scrollable_frame, bg='#3c3c3c')
             frame.pack(fill='x', pady=2)
 
@@ -127,7 +159,7 @@ class HistoryPopup(tk.Toplevel):
             del_btn = tk.Button(
                 frame,
                 text='x',
-                command=lambda idx=i: self._delete_item(idx),
+                command=lambda it=item: self._delete_item(it),
                 bg='#3c3c3c',
                 fg='#ff6b6b',
                 relief='flat',
@@ -161,21 +193,60 @@ class HistoryPopup(tk.Toplevel):
 
             # クリックで選択
             for widget in [frame, preview_label, time_label]:
-                widget.bind('<Button-1>', lambda e, idx=i: self._select_item(idx))
+                widget.bind('<Button-1>', lambda e, it=item: self._select_item(it))
                 widget.configure(cursor='hand2')
 
-    def _select_item(self, index: int):
+        if has_more:
+            self.more_btn = tk.Button(
+                self.scrollable_frame,
+                text=self.get_text("history_more"),
+                command=self._on_more,
+                bg='#2d2d2d',
+                fg='#888888',
+                relief='flat',
+                font=('Arial', 9),
+                cursor='hand2'
+            )
+            self.more_btn.pack(fill='x', pady=2)
+
+    def _on_more(self):
+        """「さらに表示」：ボタンを消して次のページを追加"""
+        self.more_btn.destroy()
+        self._append_page()
+
+    def _select_item(self, item: dict):
         """アイテムを選択してコピー"""
-        content = self.history.get_content(self.category, index)
+        # 検索結果は位置ではなく id で引く
+        if "id" in item:
+            content = self.history.get_content_by_id(item["id"])
+        else:
+            content = self.history.get_content(self.category, item["index"])
         if content:
             self.on_select(content)
         self.destroy()
 
-    def _delete_item(self, index: int):
+    def _delete_item(self, item: dict):
         """アイテムを削除"""
-        self.history.delete(self.category, index)
+        if "id" in item:
+            self.history.delete_by_id(item["id"])
+        else:
+            self.history.delete(self.category, item["index"])
         self.refresh()
 
+    def _on_search_change(self, event=None):
+        """検索欄の入力が止まったら検索し直す"""
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self):
+        self.search_job = None
+        query = self.search_entry.get().strip()
+        if query != self.query:
+            self.query = query
+            self.refresh()
+            self.canvas.yview_moveto(0)
+
     def refresh(self):
         """履歴リストを再読み込み"""
         for widget in self.scrollable_frame.winfo_children():
@@ -184,8 +255,10 @@ class HistoryPopup(tk.Toplevel):
 
     def _on_key(self, event):
         """キーボードショートカット"""
+        # 検索欄への入力はショートカットにしない
+        if event.widget is self.search_entry:
+            return
         if event.char.isdigit() and event.char != '0':
             index = int(event.char) - 1
-            items = self.history.get_list(self.category)
-            if index < len(items):
-                self._select_item(index)
+            if index < len(self.items):
+                self._select_item(self.items[index])
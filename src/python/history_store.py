@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - SQLite のコピー履歴
+
+CopyHistory と同じ add / get_list / get_content / delete を持ち、件数の上限なしで
+履歴を SQLite に保存する。一覧はページ単位で取得し、全文は選ばれたときだけ読むので、
+件数が増えても履歴ポップアップを開く時間は変わらない。
+FTS5 が使える場合は全文検索のインデックスを作る（使えない場合は LIKE で検索する）。
+"""
+
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+
+from copy_history import CopyHistory
+
+# 一覧の1ページの件数
+PAGE_SIZE = 50
+
+_ENTRY_COLUMNS = "id, timestamp, preview"
+
+
+def _content_hash(content):
+    """重複判定用の内容ハッシュ"""
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _escape_like(text):
+    """LIKE のワイルドカードをエスケープ"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SQLiteHistory:
+    """SQLite に保存するコピー履歴"""
+
+    CATEGORIES = CopyHistory.CATEGORIES
+
+    def __init__(self, db_path, max_entries=None):
+        """
+        Args:
+            db_path: データベースファイルのパス
+            max_entries: カテゴリごとの上限件数（None なら無制限）
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " category TEXT NOT NULL,"
+            " timestamp TEXT NOT NULL,"
+            " preview TEXT NOT NULL,"
+            " content TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_order ON entries (category, timestamp DESC, id DESC)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_hash ON entries (category, content_hash)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.fts_tokenizer = self._create_fts()
+        self.conn.commit()
+
+    def _create_fts(self):
+        """
+        全文検索のインデックス（FTS5）を作る
+
+        日本語は空白で区切られないので、trigram トークナイザ（SQLite 3.34 以降）を優先する。
+
+        Returns:
+            str: 使っているトークナイザ（FTS5 が使えない場合は None）
+        """
+        row = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'entries_fts'"
+        ).fetchone()
+        if row is not None:
+            return "trigram" if "trigram" in row[0] else "unicode61"
+
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                self.conn.execute(
+                    "CREATE VIRTUAL TABLE entries_fts USING fts5("
+                    f" content, content='entries', content_rowid='id', tokenize='{tokenizer}')"
+                )
+            except sqlite3.OperationalError:
+                continue
+            self.conn.executescript(
+                "CREATE TRIGGER entries_ai AFTER INSERT ON entries BEGIN"
+                "  INSERT INTO entries_fts (rowid, content) VALUES (new.id, new.content);"
+                " END;"
+                "CREATE TRIGGER entries_ad AFTER DELETE ON entries BEGIN"
+                "  INSERT INTO entries_fts (entries_fts, rowid, content) VALUES ('delete', old.id, old.content);"
+                " END;"
+                "INSERT INTO entries_fts (entries_fts) VALUES ('rebuild');"
+            )
+            print(f"[DEBUG] History full-text index: fts5 ({tokenizer})")
+            return tokenizer
+
+        print("[DEBUG] History full-text index: FTS5 not available, using LIKE")
+        return None
+
+    def _insert(self, category, entry):
+        """エントリを1件追加（lock を保持して呼ぶ）"""
+        self.conn.execute(
+            "INSERT INTO entries (category, timestamp, preview, content, content_hash) VALUES (?, ?, ?, ?, ?)",
+            (category, entry["timestamp"], entry["preview"], entry["content"], _content_hash(entry["content"]))
+        )
+
+    def _trim(self, category):
+        """上限件数を超えた古いエントリを削除（lock を保持して呼ぶ）"""
+        if self.max_entries is None:
+            return
+        self.conn.execute(
+            "DELETE FROM entries WHERE id IN ("
+            " SELECT id FROM entries WHERE category = ?"
+            " ORDER BY timestamp DESC, id DESC LIMIT -1 OFFSET ?)",
+            (category, self.max_entries)
+        )
+
+    def add(self, category: str, content: str, prefix_to_remove: str = ""):
+        """履歴を追加
+
+        Args:
+            category: 'gpt_to_cc' or 'cc_to_gpt'
+            content: コピーする全文
+            prefix_to_remove: プレビューから除去する枕文（オプション）
+        """
+        entry = CopyHistory._make_entry(content, prefix_to_remove, datetime.now().isoformat())
+        with self.lock:
+            self._insert(category, entry)
+            self._trim(category)
+            self.conn.commit()
+
+    def import_entries(self, category: str, entries, prefix_to_remove: str = "") -> int:
+        """履歴を一括で取り込む（既存と同じ内容は除外し、1トランザクションで書き込む）
+
+        Args:
+            category: 'gpt_to_cc' or 'cc_to_gpt'
+            entries: (タイムスタンプ, 全文) の iterable
+            prefix_to_remove: プレビューから除去する枕文（オプション）
+
+        Returns:
+            int: 取り込まれた件数
+        """
+        imported = 0
+        with self.lock:
+            for timestamp, content in entries:
+                exists = self.conn.execute(
+                    "SELECT 1 FROM entries WHERE category = ? AND content_hash = ? LIMIT 1",
+                    (category, _content_hash(content))
+                ).fetchone()
+                if exists:
+                    continue
+                entry = CopyHistory._make_entry(content, prefix_to_remove,
+                                                CopyHistory._to_local_timestamp(timestamp))
+                self._insert(category, entry)
+                imported += 1
+            self._trim(category)
+            self.conn.commit()
+        return imported
+
+    @staticmethod
+    def _to_items(rows, offset):
+        return [
+            {"index": offset + i, "id": entry_id, "timestamp": timestamp, "preview": preview}
+            for i, (entry_id, timestamp, preview) in enumerate(rows)
+        ]
+
+    def get_list(self, category: str, offset: int = 0, limit: int = PAGE_SIZE) -> list:
+        """
+        プレビューリストを新しい順に1ページ分取得
+
+        Args:
+            category: 'gpt_to_cc' or 'cc_to_gpt'
+            offset: 先頭から何件飛ばすか
+            limit: 取得件数（None なら全件）
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {_ENTRY_COLUMNS} FROM entries WHERE category = ?"
+                " ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                (category, -1 if limit is None else limit, offset)
+            ).fetchall()
+        return self._to_items(rows, offset)
+
+    def search(self, category: str, query: str, offset: int = 0, limit: int = PAGE_SIZE) -> list:
+        """
+        全文検索（空白区切りの語をすべて含むものを新しい順に）
+
+        Args:
+            category: 'gpt_to_cc' or 'cc_to_gpt'
+            query: 検索語
+            offset: 先頭から何件飛ばすか
+            limit: 取得件数
+
+        Returns:
+            list: get_list と同じ形式（index は検索結果内の位置）
+        """
+        terms = query.split()
+        if not terms:
+            return self.get_list(category, offset, limit)
+
+        # trigram は3文字未満の語を引けないので、その場合は LIKE で探す
+        min_length = 3 if self.fts_tokenizer == "trigram" else 1
+        if self.fts_tokenizer and all(len(term) >= min_length for term in terms):
+            match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+            sql = (f"SELECT {_ENTRY_COLUMNS} FROM entries WHERE category = ? AND id IN"
+                   " (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)"
+                   " ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?")
+            params = (category, match, limit, offset)
+        else:
+            conditions = " AND ".join("content LIKE ? ESCAPE '\\'" for _ in terms)
+            sql = (f"SELECT {_ENTRY_COLUMNS} FROM entries WHERE category = ? AND {conditions}"
+                   " ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?")
+            params = (category, *(f"%{_escape_like(term)}%" for term in terms), limit, offset)
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return self._to_items(rows, offset)
+
+    def count(self, category: str) -> int:
+        """カテゴリの件数"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM entries WHERE category = ?", (category,)).fetchone()[0]
+
+    def _id_at(self, category, index):
+        """新しい順で index 番目のエントリの id（lock を保持して呼ぶ）"""
+        row = self.conn.execute(
+            "SELECT id FROM entries WHERE category = ? ORDER BY timestamp DESC, id DESC LIMIT 1 OFFSET ?",
+            (category, index)
+        ).fetchone() if index >= 0 else None
+        return row[0] if row else None
+
+    def get_content(self, category: str, index: int) -> str:
+        """指定インデックスの全文を取得"""
+        with self.lock:
+            entry_id = self._id_at(category, index)
+            if entry_id is None:
+                return ""
+            return self.conn.execute("SELECT content FROM entries WHERE id = ?", (entry_id,)).fetchone()[0]
+
+    def get_content_by_id(self, entry_id: int) -> str:
+        """get_list / search が返した id の全文を取得"""
+        with self.lock:
+            row = self.conn.execute("SELECT content FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        return row[0] if row else ""
+
+    def delete(self, category: str, index: int):
+        """指定インデックスの履歴を削除"""
+        with self.lock:
+            entry_id = self._id_at(category, index)
+            if entry_id is not None:
+                self.conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+                self.conn.commit()
+
+    def delete_by_id(self, entry_id: int):
+        """get_list / search が返した id の履歴を削除"""
+        with self.lock:
+            self.conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+            self.conn.commit()
+
+    def is_migrated(self) -> bool:
+        """JSON の履歴を取り込み済みか"""
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone() is not None
+
+    def migrate_from(self, legacy):
+        """
+        CopyHistory（JSON）の履歴をそのまま取り込む（初回のみ）
+
+        Args:
+            legacy: CopyHistory
+
+        Returns:
+            bool: 取り込んだ場合 True
+        """
+        if self.is_migrated():
+            return False
+        with self.lock:
+            for category in self.CATEGORIES:
+                # 古い順に入れる（同じタイムスタンプでも id の順で並ぶように）
+                items = legacy.get_list(category)
+                for item in reversed(items):
+                    entry = {"timestamp": item["timestamp"], "preview": item["preview"],
+                             "content": legacy.get_content(category, item["index"])}
+                    self._insert(category, entry)
+                print(f"[DEBUG] Migrated {len(items)} {category} history entries to SQLite")
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('migrated', ?)", (datetime.now().isoformat(),))
+            self.conn.commit()
+        return True
+
+    def close(self):
+        """接続を閉じる"""
+        with self.lock:
+            self.conn.close()
+
+
+def open_history(backend, settings_dir, known_prefixes=()):
+    """
+    設定に応じたコピー履歴を開く
+
+    SQLite を初めて使うときは、それまでの JSON の履歴を取り込む。
+
+    Args:
+        backend: "json" または "sqlite"
+        settings_dir: 履歴ファイルを置くディレクトリ
+        known_prefixes: JSON の旧形式のエントリから切り離す枕文（CopyHistory に渡す）
+
+    Returns:
+        CopyHistory または SQLiteHistory
+    """
+    json_file = settings_dir / 'copy_history.json'
+    if backend != "sqlite":
+        return CopyHistory(json_file, known_prefixes=known_prefixes)
+
+    try:
+        history = SQLiteHistory(settings_dir / 'copy_history.db')
+    except sqlite3.Error as e:
+        print(f"[DEBUG] Failed to open history database, using JSON: {e}")
+        return CopyHistory(json_file, known_prefixes=known_prefixes)
+
+    # 一度も圧縮していない履歴は本体がなく、ジャーナルだけのこともある
+    journal_file = json_file.with_name(json_file.name + '.journal')
+    if (json_file.exists() or journal_file.exists()) and not history.is_migrated():
+        # JSON の履歴はそのまま残す（読み取り専用で開き、blob 形式への変換も書き出しもしない）
+        legacy = CopyHistory(json_file, read_only=True)
+        history.migrate_from(legacy)
+        legacy.close()
+    return history
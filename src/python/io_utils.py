@@ -3,6 +3,10 @@
 Bridgiron - ファイルIO共通処理
 """
 
+import codecs
+import os
+
+
 def read_file_with_encoding(filepath, encodings=None):
     """
     複数エンコーディングを試してファイルを読む
@@ -47,3 +51,214 @@ def read_file_lines_with_encoding(filepath, encodings=None):
     if content is None:
         return None
     return content.splitlines()
+
+
+def iter_lines_reversed(filepath, block_size=65536):
+    """
+    ファイルを末尾から固定サイズのブロック単位で逆読みし、行を新しい順に返す
+
+    メモリ使用量はブロックサイズ + 最長行の長さで頭打ちになる。
+    行はデコードせずバイト列のまま返す（"\n" は除去、"\r" は残る）。
+    最初に返る行は最後の改行より後ろの断片（改行で終わるファイルでは空行）。
+
+    Args:
+        filepath: ファイルパス
+        block_size: 1回に読み込むバイト数
+
+    Yields:
+        tuple: (行頭のバイトオフセット, 行のバイト列)（末尾の行から順に）
+    """
+    with open(filepath, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        # 改行をまたぐ断片（後ろ側のブロックから順）。長い行でも毎回連結し直さないよう溜めておく
+        pending = []
+
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+
+            if b"\n" not in block:
+                pending.append(block)
+                continue
+
+            block = block + b"".join(reversed(pending))
+            pending = []
+
+            lines = block.split(b"\n")
+            # 先頭の断片は前のブロックと繋がる可能性があるので持ち越す
+            pending.append(lines[0])
+            line_end = position + len(block)
+            for line in reversed(lines[1:]):
+                line_start = line_end - len(line)
+                yield line_start, line
+                line_end = line_start - 1
+
+        yield 0, b"".join(reversed(pending))
+
+
+def iter_lines_from(filepath, offset=0, block_size=65536):
+    """
+    指定オフセットから順方向にブロック単位で読み、行を古い順に返す
+
+    Args:
+        filepath: ファイルパス
+        offset: 読み始めるバイトオフセット（行頭であること）
+        block_size: 1回に読み込むバイト数
+
+    Yields:
+        tuple: (行頭のバイトオフセット, 行のバイト列, 改行で終わっているか)
+            最後の行が改行で終わっていない場合のみ False になる
+    """
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        line_start = offset
+        # 改行をまたぐ断片。長い行でも毎回連結し直さないよう溜めておく
+        pending = []
+
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+
+            if b"\n" not in block:
+                pending.append(block)
+                continue
+
+            pending.append(block)
+            lines = b"".join(pending).split(b"\n")
+            # 末尾の断片は次のブロックと繋がる可能性があるので持ち越す
+            pending = [lines.pop()]
+            for line in lines:
+                yield line_start, line, True
+                line_start += len(line) + 1
+
+        remainder = b"".join(pending)
+        if remainder:
+            yield line_start, remainder, False
+
+
+def read_signature(filepath, offset, length):
+    """
+    offset 直前の最大 length バイトを読む
+
+    追記専用のファイルで、解析済みの位置より前が書き換えられていないかの確認に使う。
+    """
+    start = max(0, offset - length)
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        return f.read(offset - start)
+
+
+class FileCursor:
+    """
+    追記専用ファイルの差分読み取り位置
+
+    解析済みのバイト位置と、ファイルの同一性・変更の有無を判定するための stat 情報を持つ。
+    """
+
+    def __init__(self, stat, offset=0, signature=b""):
+        self.dev = stat.st_dev
+        self.ino = stat.st_ino
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.offset = offset          # 解析済みバイト位置（次回はここから読む）
+        self.signature = signature    # offset 直前のバイト列（置き換え検出用）
+
+    def is_same_file(self, stat):
+        """同一ファイルで、解析済み位置より縮んでいないか"""
+        return (stat.st_dev == self.dev and stat.st_ino == self.ino
+                and stat.st_size >= self.offset)
+
+    def is_unchanged(self, stat):
+        """前回から一切変更がないか"""
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+
+class PartialLineReader:
+    """
+    書き込み途中の末尾行を、追記された分だけ読み足しながら保持する
+
+    読み足したバイトは UTF-8 のインクリメンタルデコーダに順に通すので、
+    マルチバイト文字が読み取り境界で切れていても行全体を読み直さずに済み、
+    文字の途中で終わっている行はデコーダの状態だけで未完成と判定できる。
+    """
+
+    def __init__(self, filepath, offset, data=b"", block_size=65536):
+        """
+        Args:
+            filepath: ファイルパス
+            offset: 行頭のバイトオフセット
+            data: 既に読んである行の先頭部分
+            block_size: 1回に読み込むバイト数
+        """
+        self.filepath = filepath
+        self.offset = offset
+        self.block_size = block_size
+        self.chunks = []
+        self.length = 0
+        self.terminated = False   # 改行まで読めたか
+        self.valid = True         # ここまで UTF-8 として正しいか
+        self.last_char = ""       # 最後の空白以外の文字
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        if data:
+            self._feed(data)
+
+    def _feed(self, data):
+        newline = data.find(b"\n")
+        if newline != -1:
+            data = data[:newline]
+            self.terminated = True
+        if not data:
+            return
+
+        self.chunks.append(data)
+        self.length += len(data)
+        if self.valid:
+            try:
+                text = self.decoder.decode(data).rstrip()
+            except UnicodeDecodeError:
+                self.valid = False
+                return
+            if text:
+                self.last_char = text[-1]
+
+    @property
+    def line(self):
+        """ここまでに読んだ行のバイト列（改行は含まない）"""
+        if len(self.chunks) > 1:
+            self.chunks = [b"".join(self.chunks)]
+        return self.chunks[0] if self.chunks else b""
+
+    def read_more(self):
+        """
+        前回の続きから改行またはファイル末尾まで読み足す
+
+        Returns:
+            bool: 新しいバイトを読めたか
+        """
+        if self.terminated:
+            return False
+        grew = False
+        with open(self.filepath, 'rb') as f:
+            f.seek(self.offset + self.length)
+            while not self.terminated:
+                block = f.read(self.block_size)
+                if not block:
+                    break
+                grew = True
+                self._feed(block)
+        return grew
+
+    def may_be_complete(self):
+        """
+        JSON の1行として完結している可能性があるか（デコードせずに判定）
+
+        改行まで読めていれば True。文字の途中で切れている・'}' で終わっていない場合は False。
+        """
+        if self.terminated:
+            return True
+        pending, _ = self.decoder.getstate()
+        return self.valid and not pending and self.last_char == "}"
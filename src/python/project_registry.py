@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - Claude Code プロジェクト一覧
+
+~/.claude/projects を一度だけ列挙し、プロジェクトパスからログディレクトリを
+メモリ上の辞書で引けるようにする。ルートディレクトリの mtime が変わったとき
+（プロジェクトが増えた・消えたとき）だけ列挙し直す。
+"""
+
+import os
+import re
+import threading
+from pathlib import Path
+
+# Claude Code がプロジェクトパスをディレクトリ名にする規則（英数字以外を '-' に置換）
+_HASH_PATTERN = re.compile(r"[^A-Za-z0-9]")
+
+
+def get_home_dir():
+    """
+    ホームディレクトリを取得（Windows は USERPROFILE、Linux / macOS は HOME）
+
+    Returns:
+        Path: ホームディレクトリ（取得できない場合は None）
+    """
+    home = os.environ.get("USERPROFILE", "") or os.environ.get("HOME", "")
+    if not home:
+        return None
+    return Path(home)
+
+
+def get_projects_root():
+    """
+    Claude Code のプロジェクトログのルート（~/.claude/projects）を取得
+
+    Returns:
+        Path: ルートディレクトリ（ホームが取得できない場合は None）
+    """
+    home = get_home_dir()
+    if home is None:
+        return None
+    return home / ".claude" / "projects"
+
+
+def project_hashes(project_path):
+    """
+    プロジェクトパスからログディレクトリ名の候補を返す
+
+    Args:
+        project_path: プロジェクトパス
+
+    Returns:
+        list: ディレクトリ名の候補（優先順）
+    """
+    if "\\" in project_path or re.match(r"^[A-Za-z]:", project_path):
+        # Windows 形式
+        path_normalized = project_path.replace("/", "\\").rstrip("\\")
+        legacy = path_normalized.replace(":", "-").replace("\\", "-").replace("_", "-")
+    else:
+        # Linux / macOS 形式（ルート "/" 自体は残す）
+        path_normalized = project_path.rstrip("/") or "/"
+        legacy = None
+
+    hashes = [_HASH_PATTERN.sub("-", path_normalized)]
+    if legacy and legacy not in hashes:
+        hashes.append(legacy)
+    return hashes
+
+
+class ProjectRegistry:
+    """プロジェクトのログディレクトリ一覧"""
+
+    def __init__(self, root):
+        self.root = Path(root) if root else None
+        self.lock = threading.Lock()
+        self.root_mtime_ns = None
+        self.dirs = {}
+        self.hash_cache = {}
+
+    @staticmethod
+    def _key(name):
+        # Windows ではパスの大文字小文字を区別しない
+        return os.path.normcase(name)
+
+    def _refresh_if_changed(self):
+        """ルートの mtime が変わっていれば列挙し直す（lock を保持して呼ぶ）"""
+        if self.root is None:
+            return
+        try:
+            mtime_ns = os.stat(self.root).st_mtime_ns
+        except OSError:
+            self.root_mtime_ns = None
+            self.dirs = {}
+            return
+        if mtime_ns == self.root_mtime_ns:
+            return
+
+        dirs = {}
+        try:
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            dirs[self._key(entry.name)] = Path(entry.path)
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"[DEBUG] Project scan error: {e}")
+            return
+        self.dirs = dirs
+        self.root_mtime_ns = mtime_ns
+        print(f"[DEBUG] Project registry refreshed: {len(dirs)} projects")
+
+    def get_log_dir(self, project_path):
+        """
+        プロジェクトパスからログディレクトリを取得
+
+        Args:
+            project_path: プロジェクトパス
+
+        Returns:
+            Path: ログディレクトリ（存在しない場合は None）
+        """
+        if not project_path:
+            return None
+
+        with self.lock:
+            self._refresh_if_changed()
+            hashes = self.hash_cache.get(project_path)
+            if hashes is None:
+                hashes = [self._key(h) for h in project_hashes(project_path)]
+                self.hash_cache[project_path] = hashes
+            for path_hash in hashes:
+                log_dir = self.dirs.get(path_hash)
+                if log_dir is not None:
+                    return log_dir
+        return None
+
+    def get_log_dirs(self, project_paths):
+        """
+        複数のプロジェクトパスをまとめて引く
+
+        Returns:
+            dict: プロジェクトパス → ログディレクトリ（見つからないものは含まない）
+        """
+        result = {}
+        for project_path in project_paths:
+            log_dir = self.get_log_dir(project_path)
+            if log_dir is not None:
+                result[project_path] = log_dir
+        return result
+
+    def list_log_dirs(self):
+        """
+        ルート配下のログディレクトリをすべて返す
+
+        Returns:
+            list: ログディレクトリの Path（ディレクトリ名順）
+        """
+        with self.lock:
+            self._refresh_if_changed()
+            return sorted(self.dirs.values(), key=lambda p: p.name)
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_project_registry():
+    """
+    既定のプロジェクト一覧を取得（初回呼び出し時に作成）
+
+    ホームディレクトリが変わった場合（テストやベンチマークで環境変数を差し替えた場合）は作り直す。
+    """
+    global _default_registry
+    root = get_projects_root()
+    with _default_registry_lock:
+        if _default_registry is None or _default_registry.root != root:
+            _default_registry = ProjectRegistry(root)
+        return _default_registry
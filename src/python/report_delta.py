@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - 前回のCC報告との差分
+
+仕様→実装のループでは、続けて出る報告の大半が前回と同じになる。
+前回の報告との行単位の差分を取り、変わった部分だけを短い文脈付きで返す。
+差分の計算量には上限を設け、超える場合や差分の方が大きい場合は全文を使う。
+"""
+
+import bisect
+import difflib
+
+# 差分の前後に付ける文脈の行数
+DELTA_CONTEXT_LINES = 2
+
+# SequenceMatcher で比較する範囲の行数の積の合計の上限（超える範囲は一意な行で分割する）
+MAX_DIFF_CELLS = 4_000_000
+
+# 差分が全文のこの割合以上なら、差分ではなく全文を使う
+MAX_DELTA_RATIO = 0.8
+
+DELTA_HEADER = "[Changes since the previous report; unchanged lines are omitted]"
+NO_CHANGES = "[No changes since the previous report]"
+
+
+def _common_prefix_length(a, b):
+    """2つの行リストの共通の先頭行数"""
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _common_suffix_length(a, b, prefix):
+    """2つの行リストの共通の末尾行数（prefix 行より前には戻らない）"""
+    limit = min(len(a), len(b)) - prefix
+    i = 0
+    while i < limit and a[-1 - i] == b[-1 - i]:
+        i += 1
+    return i
+
+
+def _unique_anchors(a, b):
+    """
+    両方に1回ずつだけ現れる行を、順序を保ったまま最も多く対応付ける（patience diff の要領）
+
+    Returns:
+        list[tuple]: (a の行番号, b の行番号) のリスト（昇順）
+    """
+    counts = {}
+    for line in a:
+        counts[line] = counts.get(line, 0) + 1
+    positions_a = {line: i for i, line in enumerate(a) if counts[line] == 1}
+    counts_b = {}
+    for line in b:
+        counts_b[line] = counts_b.get(line, 0) + 1
+    pairs = [(positions_a[line], j) for j, line in enumerate(b)
+             if counts_b[line] == 1 and line in positions_a]
+
+    # a 側の行番号の最長増加部分列（O(k log k)）
+    tails = []          # 長さごとの末尾の a 行番号
+    tail_index = []     # その pairs 上の位置
+    previous = [-1] * len(pairs)
+    for k, (i, _) in enumerate(pairs):
+        pos = bisect.bisect_left(tails, i)
+        if pos == len(tails):
+            tails.append(i)
+            tail_index.append(k)
+        else:
+            tails[pos] = i
+            tail_index[pos] = k
+        previous[k] = tail_index[pos - 1] if pos else -1
+
+    anchors = []
+    k = tail_index[-1] if tail_index else -1
+    while k != -1:
+        anchors.append(pairs[k])
+        k = previous[k]
+    anchors.reverse()
+    return anchors
+
+
+def _diff_range(a, b, a_start, a_end, b_start, b_end, opcodes, budget, allow_anchors=True):
+    """
+    a[a_start:a_end] と b[b_start:b_end] の差分を opcodes に追加する
+
+    budget は [残りのセル数]。使い切った範囲は比較せずに置き換えとして扱う。
+    """
+    if a_start == a_end and b_start == b_end:
+        return
+    if a_start == a_end:
+        opcodes.append(("insert", a_start, a_end, b_start, b_end))
+        return
+    if b_start == b_end:
+        opcodes.append(("delete", a_start, a_end, b_start, b_end))
+        return
+
+    cells = (a_end - a_start) * (b_end - b_start)
+    if cells <= budget[0]:
+        budget[0] -= cells
+        matcher = difflib.SequenceMatcher(None, a[a_start:a_end], b[b_start:b_end], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            opcodes.append((tag, a_start + i1, a_start + i2, b_start + j1, b_start + j2))
+        return
+
+    # 大きすぎる範囲は、両方に1回ずつだけ現れる行を目印に分割する（1段だけ）
+    anchors = _unique_anchors(a[a_start:a_end], b[b_start:b_end]) if allow_anchors else []
+    if not anchors:
+        opcodes.append(("replace", a_start, a_end, b_start, b_end))
+        return
+
+    i, j = a_start, b_start
+    for anchor_a, anchor_b in anchors:
+        anchor_a += a_start
+        anchor_b += b_start
+        _diff_range(a, b, i, anchor_a, j, anchor_b, opcodes, budget, allow_anchors=False)
+        opcodes.append(("equal", anchor_a, anchor_a + 1, anchor_b, anchor_b + 1))
+        i, j = anchor_a + 1, anchor_b + 1
+    _diff_range(a, b, i, a_end, j, b_end, opcodes, budget, allow_anchors=False)
+
+
+def diff_lines(a, b):
+    """
+    2つの行リストの差分（SequenceMatcher.get_opcodes と同じ形式）
+
+    共通の先頭・末尾を線形時間で除き、残りが大きい場合は一意な行で分割してから比較する。
+    """
+    prefix = _common_prefix_length(a, b)
+    suffix = _common_suffix_length(a, b, prefix)
+    opcodes = []
+    if prefix:
+        opcodes.append(("equal", 0, prefix, 0, prefix))
+    _diff_range(a, b, prefix, len(a) - suffix, prefix, len(b) - suffix, opcodes, [MAX_DIFF_CELLS])
+    if suffix:
+        opcodes.append(("equal", len(a) - suffix, len(a), len(b) - suffix, len(b)))
+
+    # 隣り合う equal をまとめる
+    merged = []
+    for op in opcodes:
+        if merged and op[0] == "equal" and merged[-1][0] == "equal":
+            tag, i1, _, j1, _ = merged[-1]
+            merged[-1] = (tag, i1, op[2], j1, op[4])
+        else:
+            merged.append(op)
+    return merged
+
+
+def _group_opcodes(opcodes, context):
+    """変更箇所ごとに、前後 context 行の equal を付けてまとめる（difflib の get_grouped_opcodes と同じ）"""
+    if not opcodes:
+        return
+    if opcodes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = opcodes[0]
+        opcodes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if opcodes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = opcodes[-1]
+        opcodes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+
+    group = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        # 長い equal はグループの区切りにする
+        if tag == "equal" and i2 - i1 > context * 2:
+            group.append((tag, i1, i1 + context, j1, j1 + context))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def make_delta(previous, current, context=DELTA_CONTEXT_LINES):
+    """
+    前回の報告との差分テキストを作る
+
+    Args:
+        previous: 前回の報告
+        current: 今回の報告
+        context: 変更箇所の前後に付ける行数
+
+    Returns:
+        str: 差分テキスト（差分を使わない方がよい場合は None）
+    """
+    if not previous or not current:
+        return None
+    if previous == current:
+        return NO_CHANGES
+
+    a = previous.split("\n")
+    b = current.split("\n")
+
+    lines = [DELTA_HEADER]
+    for group in _group_opcodes(diff_lines(a, b), context):
+        lines.append(f"@@ line {group[0][3] + 1} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                lines.extend(" " + line for line in b[j1:j2])
+                continue
+            if tag in ("replace", "delete"):
+                lines.extend("-" + line for line in a[i1:i2])
+            if tag in ("replace", "insert"):
+                lines.extend("+" + line for line in b[j1:j2])
+
+            # 全文より大きくなりそうなら打ち切る
+            if len(lines) > len(b):
+                return None
+
+    delta = "\n".join(lines)
+    if len(delta) >= len(current) * MAX_DELTA_RATIO:
+        return None
+    return delta
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - CC報告の整形パイプライン
+
+報告テキストを1行ずつ流す整形ステージの連鎖。各ステージは行のイテレータを受け取って
+行のイテレータを返すジェネレータなので、途中で報告全体のコピーを作らずに済む。
+最後に1回だけ連結する。
+
+ステージ:
+    ansi        ANSI エスケープシーケンスを除去
+    whitespace  行末の空白を削り、連続する空行を1行にまとめる（コードブロックの中は触らない）
+    dedupe      連続する同一行をまとめる（コードブロックの中は触らない）
+    code        長いコードブロックの中ほどを省略
+    traces      長いスタックトレースの中ほどを省略
+
+既定では ansi だけを有効にする。ほかのステージは本文を書き換えるので、設定で明示的に有効にする。
+"""
+
+import re
+import threading
+import time
+from collections import deque
+
+# ANSI エスケープシーケンス（CSI / OSC）
+_ANSI_PATTERN = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-Z\\-_]")
+
+# スタックトレースのフレーム行（Python / JavaScript / Java / C#）
+_FRAME_PATTERN = re.compile(r'^\s+(?:File ".*", line \d+|at \S)')
+_PYTHON_FRAME_PATTERN = re.compile(r'^\s+File ".*", line \d+')
+
+# 連続する同一行をまとめ始める回数
+DEDUPE_MIN_REPEATS = 3
+
+# コードブロックを省略し始める行数と、省略時に前後に残す行数
+CODE_BLOCK_MAX_LINES = 60
+CODE_BLOCK_KEEP_LINES = 20
+
+# スタックトレースを省略し始める行数と、省略時に前後に残す行数
+TRACE_MAX_LINES = 16
+TRACE_KEEP_LINES = 6
+
+# 既定で有効なステージ（本文を書き換えるもの＝whitespace / dedupe / code / traces は明示的に有効にする）
+DEFAULT_STAGES = ("ansi",)
+
+# Markdown の強制改行（行末の2つ以上の空白）
+MARKDOWN_HARD_BREAK = "  "
+
+
+def iter_lines(text):
+    """
+    テキストを1行ずつ返す（splitlines のように全行のリストを作らない）
+
+    Yields:
+        str: 改行を含まない1行
+    """
+    start = 0
+    length = len(text)
+    while start < length:
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def _iter_fenced(lines):
+    """
+    各行に、``` で囲まれたコードブロックの中（囲みの行を含む）かどうかを添えて返す
+
+    Yields:
+        tuple: (行, コードブロックの中か)
+    """
+    in_block = False
+    for line in lines:
+        if line.lstrip().startswith("```"):
+            in_block = not in_block
+            yield line, True
+        else:
+            yield line, in_block
+
+
+def strip_ansi(lines):
+    """ANSI エスケープシーケンスを除去"""
+    for line in lines:
+        if "\x1b" in line:
+            line = _ANSI_PATTERN.sub("", line)
+        yield line
+
+
+def normalize_whitespace(lines):
+    """
+    行末の空白（\\r を含む）を削り、連続する空行を1行にまとめる。先頭と末尾の空行も落とす
+
+    コードブロックの中は空白も空行もそのまま残す。Markdown の強制改行（行末の2つ以上の空白）は
+    2つの空白として残す。
+    """
+    blank_pending = False
+    started = False
+    for line, in_block in _iter_fenced(lines):
+        if not in_block:
+            stripped = line.rstrip()
+            if not stripped:
+                blank_pending = started
+                continue
+            if line.rstrip("\r").endswith(MARKDOWN_HARD_BREAK):
+                stripped += MARKDOWN_HARD_BREAK
+            line = stripped
+        if blank_pending:
+            yield ""
+            blank_pending = False
+        started = True
+        yield line
+
+
+def dedupe_lines(lines):
+    """連続する同一行を1行と繰り返し回数の注記にまとめる（空行・コードブロックの中はそのまま）"""
+    previous = None
+    repeats = 0
+
+    for line, in_block in _iter_fenced(lines):
+        if line == previous and line.strip() and not in_block:
+            repeats += 1
+            continue
+        if repeats:
+            yield from _repeated(previous, repeats)
+        previous = line
+        repeats = 0
+        yield line
+
+    if repeats:
+        yield from _repeated(previous, repeats)
+
+
+def _repeated(line, repeats):
+    """dedupe_lines で、1行目のあとに続いた repeats 行分を出力"""
+    if repeats + 1 < DEDUPE_MIN_REPEATS:
+        for _ in range(repeats):
+            yield line
+    else:
+        yield f"... (above line repeated {repeats} more times)"
+
+
+class _RunCollapser:
+    """
+    連続する行のまとまり（コードブロック・トレース）が長い場合に中ほどを省略する
+
+    先頭の keep_lines 行はすぐに流し、残りは max_lines を超えるまで保留する。
+    超えた時点で末尾 keep_lines 行だけを保持するように切り替えるので、
+    メモリに持つのは max_lines 行まで。
+    """
+
+    def __init__(self, max_lines, keep_lines, indent=""):
+        self.max_lines = max_lines
+        self.keep_lines = keep_lines
+        self.indent = indent
+        self.count = 0
+        self.pending = []
+        self.tail = None
+
+    def add(self, line):
+        """1行追加し、すぐに出力してよい行を返す"""
+        self.count += 1
+        if self.count <= self.keep_lines:
+            return (line,)
+        if self.tail is not None:
+            self.tail.append(line)
+        else:
+            self.pending.append(line)
+            if self.count > self.max_lines:
+                self.tail = deque(self.pending, maxlen=self.keep_lines)
+                self.pending = []
+        return ()
+
+    def finish(self):
+        """まとまりの終わり：保留していた行（省略時は注記と末尾）を返し、状態を戻す"""
+        if self.tail is None:
+            lines = self.pending
+        else:
+            omitted = self.count - self.keep_lines - len(self.tail)
+            lines = [f"{self.indent}... ({omitted} lines omitted) ..."] + list(self.tail)
+        self.count = 0
+        self.pending = []
+        self.tail = None
+        return lines
+
+
+def collapse_code_blocks(lines):
+    """``` で囲まれたコードブロックが長い場合、中ほどを省略する"""
+    in_block = False
+    run = _RunCollapser(CODE_BLOCK_MAX_LINES, CODE_BLOCK_KEEP_LINES)
+
+    for line in lines:
+        if line.lstrip().startswith("```"):
+            if in_block:
+                yield from run.finish()
+            in_block = not in_block
+            yield line
+        elif in_block:
+            yield from run.add(line)
+        else:
+            yield line
+
+    # 閉じられていないブロック
+    yield from run.finish()
+
+
+def collapse_stack_traces(lines):
+    """スタックトレースのフレームが長く続く場合、中ほどを省略する"""
+    run = _RunCollapser(TRACE_MAX_LINES, TRACE_KEEP_LINES, indent="  ")
+    after_python_frame = False
+
+    for line in lines:
+        # Python のフレームは "File ..." 行とソース行の2行組
+        is_frame = bool(_FRAME_PATTERN.match(line)) or (
+            after_python_frame and line.startswith("    ") and bool(line.strip())
+        )
+        after_python_frame = bool(_PYTHON_FRAME_PATTERN.match(line))
+
+        if is_frame:
+            yield from run.add(line)
+        else:
+            yield from run.finish()
+            yield line
+
+    yield from run.finish()
+
+
+# ステージ名 → ステージ関数
+STAGES = {
+    "ansi": strip_ansi,
+    "whitespace": normalize_whitespace,
+    "dedupe": dedupe_lines,
+    "code": collapse_code_blocks,
+    "traces": collapse_stack_traces,
+}
+
+
+class _TimedStage:
+    """ステージの出力イテレータを包み、next() にかかった時間（上流を含む）を積算する"""
+
+    def __init__(self, iterator):
+        self.iterator = iterator
+        self.elapsed = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            return next(self.iterator)
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+
+class FormatPipeline:
+    """整形ステージの連鎖"""
+
+    def __init__(self, stage_names=DEFAULT_STAGES):
+        unknown = [name for name in stage_names if name not in STAGES]
+        if unknown:
+            raise ValueError(f"unknown format stages: {', '.join(unknown)}")
+        self.stage_names = tuple(stage_names)
+
+    def run(self, text, stats=None):
+        """
+        テキストを整形する
+
+        Args:
+            text: 整形前のテキスト
+            stats: dict を渡すと、整形前後のバイト数と各ステージの所要時間（秒）を書き込む
+
+        Returns:
+            str: 整形後のテキスト
+        """
+        if not self.stage_names:
+            if stats is not None:
+                size = len(text.encode("utf-8"))
+                stats.update(before_bytes=size, after_bytes=size, stages=[])
+            return text
+
+        lines = iter_lines(text)
+        timers = []
+        for name in self.stage_names:
+            lines = _TimedStage(STAGES[name](lines))
+            timers.append((name, lines))
+
+        result = "\n".join(lines)
+
+        if stats is not None:
+            # 各タイマーは上流の時間も含むので、1つ前との差をそのステージの時間とする
+            stage_times = []
+            upstream = 0.0
+            for name, timer in timers:
+                stage_times.append((name, max(0.0, timer.elapsed - upstream)))
+                upstream = timer.elapsed
+            stats.update(
+                before_bytes=len(text.encode("utf-8")),
+                after_bytes=len(result.encode("utf-8")),
+                stages=stage_times,
+            )
+        return result
+
+
+def parse_stage_names(value):
+    """
+    設定値（カンマ区切り）をステージ名のタプルに変換（未知の名前は無視）
+
+    Args:
+        value: "ansi,whitespace,dedupe" 形式の文字列
+
+    Returns:
+        tuple: ステージ名
+    """
+    names = [name.strip() for name in value.split(",")]
+    return tuple(name for name in names if name in STAGES)
+
+
+_default_pipeline = FormatPipeline()
+_default_pipeline_lock = threading.Lock()
+
+
+def get_default_pipeline():
+    """format_report_text が使うパイプラインを取得"""
+    return _default_pipeline
+
+
+def set_default_pipeline(stage_names):
+    """
+    format_report_text が使うパイプラインを差し替える
+
+    Args:
+        stage_names: ステージ名のリスト（空なら整形しない）
+    """
+    global _default_pipeline
+    with _default_pipeline_lock:
+        _default_pipeline = FormatPipeline(stage_names)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - 複数プロジェクトのCC報告一覧UI
+"""
+
+import queue
+import sys
+import time
+import tkinter as tk
+from datetime import datetime
+from pathlib import Path
+
+from cc_report import ReportExecutor, get_cc_reports
+
+# プロジェクトルート（アイコンパス用）
+if getattr(sys, 'frozen', False):
+    SCRIPT_DIR = Path(sys.executable).resolve().parent
+    PROJECT_ROOT = SCRIPT_DIR
+else:
+    SCRIPT_DIR = Path(__file__).resolve().parent
+    PROJECT_ROOT = SCRIPT_DIR.parent.parent
+
+# 結果キューを確認する間隔（ミリ秒）
+POLL_INTERVAL_MS = 30
+
+# プレビューの最大文字数
+PREVIEW_LENGTH = 60
+
+
+class ReportPanel(tk.Toplevel):
+    def __init__(self, parent, project_paths, on_select_callback, on_paths_change, get_text_func,
+                 full_search=False):
+        super().__init__(parent)
+        self.on_select = on_select_callback
+        self.on_paths_change = on_paths_change
+        self.get_text = get_text_func
+        self.full_search = full_search
+
+        self.results = queue.Queue()
+        self.executor = ReportExecutor(self.results, func=get_cc_reports)
+        self.pending = None  # (チケット番号, 開始時刻)
+
+        # アイコン設定
+        try:
+            icon_path = PROJECT_ROOT / 'images' / 'Icon05.ico'
+            if icon_path.exists():
+                self.iconbitmap(str(icon_path))
+        except:
+            pass  # アイコン設定失敗は無視
+
+        # ウィンドウ設定
+        self.title(self.get_text("projects_title"))
+        self.configure(bg='#2d2d2d')
+        self.geometry("480x420")
+
+        # プロジェクトパス入力（1行に1つ）
+        self.paths_text = tk.Text(self, height=4, bg='#3c3c3c', fg='white', insertbackground='white',
+                                  relief='flat', font=('Arial', 9))
+        self.paths_text.pack(fill='x', padx=10, pady=(10, 5))
+        self.paths_text.insert('1.0', "\n".join(project_paths))
+
+        # 更新ボタンと状態表示
+        bar = tk.Frame(self, bg='#2d2d2d')
+        bar.pack(fill='x', padx=10)
+        self.refresh_btn = tk.Button(
+            bar,
+            text=self.get_text("btn_refresh_projects"),
+            command=self.refresh,
+            bg='#3c3c3c',
+            fg='white',
+            relief='flat',
+            font=('Arial', 9),
+            cursor='hand2'
+        )
+        self.refresh_btn.pack(side='left')
+        self.status_label = tk.Label(bar, text="", bg='#2d2d2d', fg='#888888', font=('Arial', 9))
+        self.status_label.pack(side='left', padx=10)
+
+        # 結果リスト
+        self.list_frame = tk.Frame(self, bg='#2d2d2d')
+        self.list_frame.pack(fill='both', expand=True, padx=10, pady=10)
+
+        self.bind('<Escape>', lambda e: self.destroy())
+        self.focus_set()
+
+        self.refresh()
+
+    def get_paths(self):
+        """入力欄のプロジェクトパスを取得（空行と重複を除く）"""
+        lines = [line.strip() for line in self.paths_text.get('1.0', 'end').splitlines()]
+        return list(dict.fromkeys(line for line in lines if line))
+
+    def refresh(self):
+        """全プロジェクトの報告を取り直す（実行中の要求は取り消される）"""
+        paths = self.get_paths()
+        self.on_paths_change(paths)
+        ticket = self.executor.submit(paths, full_search=self.full_search)
+        self.pending = (ticket, time.perf_counter())
+        self.status_label.config(text="...")
+        self.after(POLL_INTERVAL_MS, self._poll_results)
+
+    def _poll_results(self):
+        """結果キューを確認（after で繰り返し呼ばれる）"""
+        if self.pending is None or not self.winfo_exists():
+            return
+        ticket, started = self.pending
+        while True:
+            try:
+                result_ticket, results = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if result_ticket == ticket:
+                self.pending = None
+                # 失敗時は (False, エラーコード) が返る
+                self._show_results(results if isinstance(results, list) else [],
+                                   (time.perf_counter() - started) * 1000)
+                return
+        self.after(POLL_INTERVAL_MS, self._poll_results)
+
+    def _show_results(self, results, elapsed_ms):
+        """結果を新しい順に表示"""
+        for widget in self.list_frame.winfo_children():
+            widget.destroy()
+
+        found = sum(1 for r in results if r[1])
+        self.status_label.config(
+            text=self.get_text("msg_projects_status").format(found, len(results), elapsed_ms)
+        )
+        print(f"[DEBUG] Project reports: {found}/{len(results)} in {elapsed_ms:.1f} ms")
+
+        for project_path, success, report, mtime_ns in results:
+            frame = tk.Frame(self.list_frame, bg='#3c3c3c')
+            frame.pack(fill='x', pady=2)
+
+            # 日時（固定幅要素）
+            time_str = datetime.fromtimestamp(mtime_ns / 1e9).strftime("%m/%d %H:%M") if mtime_ns else "--"
+            time_label = tk.Label(frame, text=time_str, bg='#3c3c3c', fg='#888888', font=('Arial', 9))
+            time_label.pack(side='right', padx=5)
+
+            # プロジェクト名とプレビュー
+            name = Path(project_path.replace("\\", "/")).name or project_path
+            if success:
+                first_line = report.strip().split("\n", 1)[0]
+                preview = first_line[:PREVIEW_LENGTH]
+            else:
+                preview = self.get_text("msg_no_log" if report == "no_log" else "msg_no_report")
+            label = tk.Label(
+                frame,
+                text=f"{name}  {preview}",
+                bg='#3c3c3c',
+                fg='white' if success else '#888888',
+                font=('Arial', 10),
+                anchor='w'
+            )
+            label.pack(side='left', fill='x', expand=True, padx=(10, 5))
+
+            if success:
+                for widget in [frame, label, time_label]:
+                    widget.bind('<Button-1>', lambda e, p=project_path, r=report: self._select_item(p, r))
+                    widget.configure(cursor='hand2')
+
+    def _select_item(self, project_path, report):
+        """報告を選択してコピー"""
+        self.on_select(project_path, report)
+
+    def destroy(self):
+        """ウィンドウ破棄時にワーカーを止める"""
+        self.pending = None
+        self.executor.shutdown()
+        super().destroy()
@@ -0,0 +1,445 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - CC報告の先読み
+
+プロジェクトのログディレクトリを監視し、セッションログが更新されるたびに
+最新のCC報告をバックグラウンドで抽出しておく（Alt+C はキャッシュを読むだけになる）。
+監視方式は Linux では inotify、Windows では ReadDirectoryChangesW、
+それ以外では stat のポーリングを使う。
+"""
+
+import os
+import sys
+import struct
+import threading
+import time
+from cc_report import get_cc_report, get_log_dir
+
+# 監視対象の拡張子
+WATCH_SUFFIX = ".jsonl"
+
+# 変更がない間の待機間隔（停止フラグの確認間隔も兼ねる）
+IDLE_TIMEOUT = 0.5
+
+# 監視・抽出でエラーが出たときに監視を作り直すまでの待ち時間（秒、続けて失敗するたびに倍にする）
+ERROR_BACKOFF = 1.0
+ERROR_BACKOFF_MAX = 30.0
+
+
+def _take_snapshot(log_dir):
+    """ディレクトリ内の .jsonl について、ファイル名 → (サイズ, mtime_ns) の辞書を作る"""
+    snapshot = {}
+    try:
+        with os.scandir(log_dir) as it:
+            for entry in it:
+                if entry.name.endswith(WATCH_SUFFIX):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    snapshot[entry.name] = (st.st_size, st.st_mtime_ns)
+    except OSError:
+        pass
+    return snapshot
+
+
+class _PollingWatcher:
+    """stat のポーリングでディレクトリ内の .jsonl の変化を検出"""
+
+    def __init__(self, log_dir, interval=1.0):
+        self.log_dir = log_dir
+        self.interval = interval
+        self.snapshot = _take_snapshot(log_dir)
+
+    def wait(self, timeout):
+        """
+        変化があるまで最大 timeout 秒待つ
+
+        Returns:
+            bool: 変化を検出したら True
+        """
+        time.sleep(min(self.interval, timeout))
+        snapshot = _take_snapshot(self.log_dir)
+        changed = snapshot != self.snapshot
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class _InotifyWatcher:
+    """inotify でディレクトリ内の .jsonl の変化を検出（Linux）"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, log_dir):
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(str(log_dir)), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, "inotify_add_watch failed")
+
+    def wait(self, timeout):
+        """
+        変化があるまで最大 timeout 秒待つ
+
+        Returns:
+            bool: .jsonl の変化を検出したら True
+        """
+        import select
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+
+        changed = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+
+            # 溜まっているイベントをすべて読み捨て、.jsonl に関するものがあるか調べる
+            pos = 0
+            while pos + self.EVENT_HEADER.size <= len(data):
+                _, _, _, name_len = self.EVENT_HEADER.unpack_from(data, pos)
+                pos += self.EVENT_HEADER.size
+                name = data[pos:pos + name_len].rstrip(b"\0")
+                pos += name_len
+                if name.endswith(WATCH_SUFFIX.encode()):
+                    changed = True
+        return changed
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class _WindowsDirWatcher:
+    """ReadDirectoryChangesW でディレクトリ内の .jsonl の変化を検出（Windows）"""
+
+    FILE_LIST_DIRECTORY = 0x0001
+    FILE_SHARE_ALL = 0x00000001 | 0x00000002 | 0x00000004
+    OPEN_EXISTING = 3
+    FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+    FILE_FLAG_OVERLAPPED = 0x40000000
+    FILE_NOTIFY_CHANGE_FILE_NAME = 0x00000001
+    FILE_NOTIFY_CHANGE_SIZE = 0x00000008
+    FILE_NOTIFY_CHANGE_LAST_WRITE = 0x00000010
+    WAIT_OBJECT_0 = 0
+    BUFFER_SIZE = 65536
+
+    def __init__(self, log_dir):
+        import ctypes
+        from ctypes import wintypes
+
+        class OVERLAPPED(ctypes.Structure):
+            _fields_ = [
+                ("Internal", ctypes.c_void_p),
+                ("InternalHigh", ctypes.c_void_p),
+                ("Offset", wintypes.DWORD),
+                ("OffsetHigh", wintypes.DWORD),
+                ("hEvent", wintypes.HANDLE),
+            ]
+
+        self.ctypes = ctypes
+        self.wintypes = wintypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.CreateFileW.restype = wintypes.HANDLE
+        kernel32.CreateFileW.argtypes = [
+            wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, ctypes.c_void_p,
+            wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE
+        ]
+        kernel32.CreateEventW.restype = wintypes.HANDLE
+        kernel32.CreateEventW.argtypes = [ctypes.c_void_p, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+        kernel32.ReadDirectoryChangesW.argtypes = [
+            wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD, wintypes.BOOL, wintypes.DWORD,
+            ctypes.POINTER(wintypes.DWORD), ctypes.c_void_p, ctypes.c_void_p
+        ]
+        kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        kernel32.WaitForSingleObject.restype = wintypes.DWORD
+        kernel32.GetOverlappedResult.argtypes = [
+            wintypes.HANDLE, ctypes.c_void_p, ctypes.POINTER(wintypes.DWORD), wintypes.BOOL
+        ]
+        kernel32.ResetEvent.argtypes = [wintypes.HANDLE]
+        kernel32.CancelIoEx.argtypes = [wintypes.HANDLE, ctypes.c_void_p]
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        self.kernel32 = kernel32
+
+        self.handle = kernel32.CreateFileW(
+            str(log_dir), self.FILE_LIST_DIRECTORY, self.FILE_SHARE_ALL, None,
+            self.OPEN_EXISTING, self.FILE_FLAG_BACKUP_SEMANTICS | self.FILE_FLAG_OVERLAPPED, None
+        )
+        if not self.handle or self.handle == wintypes.HANDLE(-1).value:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+        self.event = kernel32.CreateEventW(None, True, False, None)
+        self.overlapped = OVERLAPPED()
+        self.overlapped.hEvent = self.event
+        self.buffer = ctypes.create_string_buffer(self.BUFFER_SIZE)
+        self.pending = False
+
+    def _issue_read(self):
+        """非同期の変更通知要求を発行"""
+        notify_filter = (self.FILE_NOTIFY_CHANGE_FILE_NAME | self.FILE_NOTIFY_CHANGE_SIZE
+                         | self.FILE_NOTIFY_CHANGE_LAST_WRITE)
+        ok = self.kernel32.ReadDirectoryChangesW(
+            self.handle, self.buffer, self.BUFFER_SIZE, False, notify_filter,
+            None, self.ctypes.byref(self.overlapped), None
+        )
+        if not ok:
+            raise self.ctypes.WinError(self.ctypes.get_last_error())
+        self.pending = True
+
+    def wait(self, timeout):
+        """
+        変化があるまで最大 timeout 秒待つ
+
+        Returns:
+            bool: .jsonl の変化を検出したら True
+        """
+        if not self.pending:
+            self._issue_read()
+
+        result = self.kernel32.WaitForSingleObject(self.event, int(timeout * 1000))
+        if result != self.WAIT_OBJECT_0:
+            # タイムアウト時は要求を出したまま次回に持ち越す
+            return False
+
+        transferred = self.wintypes.DWORD()
+        self.kernel32.GetOverlappedResult(
+            self.handle, self.ctypes.byref(self.overlapped), self.ctypes.byref(transferred), False
+        )
+        self.kernel32.ResetEvent(self.event)
+        self.pending = False
+
+        if transferred.value == 0:
+            # バッファあふれ：何が変わったか分からないので変化ありとみなす
+            return True
+
+        # FILE_NOTIFY_INFORMATION を辿って .jsonl に関するものがあるか調べる
+        data = self.buffer.raw[:transferred.value]
+        pos = 0
+        while True:
+            next_offset, _, name_len = struct.unpack_from("III", data, pos)
+            name = data[pos + 12:pos + 12 + name_len].decode("utf-16-le", errors="ignore")
+            if name.lower().endswith(WATCH_SUFFIX):
+                return True
+            if next_offset == 0:
+                return False
+            pos += next_offset
+
+    def close(self):
+        if self.pending:
+            self.kernel32.CancelIoEx(self.handle, self.ctypes.byref(self.overlapped))
+            transferred = self.wintypes.DWORD()
+            # 取り消しの完了を待ってからバッファを手放す
+            self.kernel32.GetOverlappedResult(
+                self.handle, self.ctypes.byref(self.overlapped), self.ctypes.byref(transferred), True
+            )
+            self.pending = False
+        self.kernel32.CloseHandle(self.event)
+        self.kernel32.CloseHandle(self.handle)
+
+
+def create_dir_watcher(log_dir, poll_interval=1.0):
+    """
+    プラットフォームに応じたディレクトリ監視を作成
+
+    ネイティブの監視が使えない場合は stat のポーリングにフォールバックする。
+
+    Args:
+        log_dir: 監視するディレクトリ
+        poll_interval: ポーリング時の間隔（秒）
+
+    Returns:
+        wait(timeout) / close() を持つ監視オブジェクト
+    """
+    try:
+        if sys.platform.startswith("linux"):
+            return _InotifyWatcher(log_dir)
+        if os.name == "nt":
+            return _WindowsDirWatcher(log_dir)
+    except Exception as e:
+        print(f"[DEBUG] Native directory watcher unavailable, polling instead: {e}")
+    return _PollingWatcher(log_dir, poll_interval)
+
+
+class ReportPrefetcher:
+    """ログディレクトリを監視し、最新のCC報告を常に抽出済みにしておく"""
+
+    def __init__(self, project_path, full_search=False, debounce=0.3, max_delay=2.0, poll_interval=1.0,
+                 token_budget=0):
+        """
+        Args:
+            project_path: プロジェクトのパス
+            full_search: get_cc_report の full_search に渡す
+            debounce: 書き込みが止んでから抽出するまでの待ち時間（秒）
+            max_delay: 書き込みが続いていても抽出する最大の遅延（秒）
+            poll_interval: ポーリング監視時の間隔（秒）
+            token_budget: get_cc_report の token_budget に渡す
+        """
+        self.project_path = project_path
+        self.full_search = full_search
+        self.token_budget = token_budget
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self.cached = None      # (成功フラグ, メッセージまたはエラーコード)
+        self.cached_stats = {}  # その整形の統計（get_cc_report の format_stats）
+        self.dirty = True       # 未反映の変更があるか
+        self.generation = 0     # 変更を検出するたびに増える（抽出中の変更の検出用）
+        self.refresh_count = 0
+
+    def start(self):
+        """監視開始"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self.thread.start()
+        print("[DEBUG] ReportPrefetcher started")
+
+    def stop(self):
+        """監視停止"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+        print("[DEBUG] ReportPrefetcher stopped")
+
+    def get_cached(self, project_path, format_stats=None):
+        """
+        先読み済みの報告を取得
+
+        Args:
+            project_path: プロジェクトのパス
+            format_stats: dict を渡すと、先読み時の整形の統計を書き込む
+
+        Returns:
+            tuple: get_cc_report と同じ (成功フラグ, メッセージまたはエラーコード)
+                   別プロジェクト・未反映の変更がある場合は None（呼び出し側で同期取得する）
+        """
+        with self.lock:
+            if project_path != self.project_path or self.dirty:
+                return None
+            if format_stats is not None and self.cached is not None:
+                format_stats.update(self.cached_stats)
+            return self.cached
+
+    def _refresh(self, log_dir):
+        """
+        最新の報告を抽出してキャッシュを更新
+
+        抽出中は監視スレッドが wait していないので、変更の通知ではなく
+        抽出の前後でログの (サイズ, mtime) を比べ、動いていたら結果を捨てて dirty のままにする。
+        """
+        with self.lock:
+            self.dirty = False
+            generation = self.generation
+        before = _take_snapshot(log_dir)
+        format_stats = {}
+        result = get_cc_report(self.project_path, full_search=self.full_search, format_stats=format_stats,
+                               token_budget=self.token_budget)
+        after = _take_snapshot(log_dir)
+        with self.lock:
+            self.refresh_count += 1
+            # 抽出中に変更が来ていたら、この結果は古い可能性がある
+            stale = self.generation != generation or before != after
+            if stale:
+                self.dirty = True
+            else:
+                self.cached = result
+                self.cached_stats = format_stats
+        print(f"[DEBUG] ReportPrefetcher refreshed (count={self.refresh_count}, stale={stale})")
+        return not stale
+
+    def _mark_dirty(self):
+        with self.lock:
+            self.dirty = True
+            self.generation += 1
+
+    def _sleep_while_running(self, seconds):
+        """停止フラグを確認しながら待つ"""
+        deadline = time.monotonic() + seconds
+        while self.running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(IDLE_TIMEOUT, remaining))
+
+    def _watch_loop(self):
+        """
+        監視ループ
+
+        監視の作成・待機・抽出でエラーが出てもスレッドは終わらず、
+        監視を閉じて少し待ってから作り直す（作り直した直後に抽出し直す）。
+        """
+        watcher = None
+        log_dir = None
+        pending_since = None
+        backoff = ERROR_BACKOFF
+
+        while self.running:
+            try:
+                if watcher is None:
+                    # ログディレクトリができるまで待つ
+                    log_dir = get_log_dir(self.project_path)
+                    if not log_dir:
+                        time.sleep(IDLE_TIMEOUT)
+                        continue
+                    watcher = create_dir_watcher(log_dir, self.poll_interval)
+                    pending_since = None if self._refresh(log_dir) else time.monotonic()
+                    backoff = ERROR_BACKOFF
+                    continue
+
+                changed = watcher.wait(self.debounce if pending_since is not None else IDLE_TIMEOUT)
+                now = time.monotonic()
+
+                if changed:
+                    self._mark_dirty()
+                    if pending_since is None:
+                        pending_since = now
+                    # 書き込みが続いている間は待つ（ただし max_delay を超えたら抽出する）
+                    if now - pending_since < self.max_delay:
+                        continue
+
+                if pending_since is not None:
+                    # 抽出中に書き込まれていたら、debounce 後にもう一度抽出する
+                    pending_since = None if self._refresh(log_dir) else time.monotonic()
+
+            except Exception as e:
+                print(f"[DEBUG] ReportPrefetcher error (retry in {backoff:.1f}s): {e}")
+                self._mark_dirty()
+                if watcher is not None:
+                    try:
+                        watcher.close()
+                    except Exception:
+                        pass
+                    watcher = None
+                self._sleep_while_running(backoff)
+                backoff = min(backoff * 2, ERROR_BACKOFF_MAX)
+
+        if watcher is not None:
+            watcher.close()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - セッションログの永続インデックス
+
+セッションログ（.jsonl）ごとに、サイズ・mtime と最新報告の位置を SQLite に記録する。
+起動直後の CC報告取得でも、変更のないファイルは再走査せずに済む。
+"""
+
+import sqlite3
+import threading
+from settings import SETTINGS_DIR
+
+INDEX_FILE = SETTINGS_DIR / 'session_index.db'
+
+# オフセット未検出を表す値
+NO_OFFSET = -1
+
+
+class SessionIndex:
+    """セッションログごとの走査結果を保持するインデックス"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " text_offset INTEGER NOT NULL,"
+            " report_offset INTEGER NOT NULL)"
+        )
+        self.conn.commit()
+
+    def lookup(self, path, stat):
+        """
+        サイズと mtime が記録時から変わっていなければ記録済みのオフセットを返す
+
+        Args:
+            path: .jsonl ファイルのパス
+            stat: 現在の os.stat_result
+
+        Returns:
+            tuple: (最新 assistant テキストのオフセット, SOR/EOR ブロック先頭のオフセット)
+                   未記録・変更ありの場合は None
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT size, mtime_ns, text_offset, report_offset FROM sessions WHERE path = ?",
+                (str(path),)
+            ).fetchone()
+
+        if row is None:
+            return None
+        size, mtime_ns, text_offset, report_offset = row
+        if size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+            return None
+        return (text_offset, report_offset)
+
+    def update(self, path, stat, text_offset, report_offset):
+        """
+        走査結果を記録
+
+        Args:
+            path: .jsonl ファイルのパス
+            stat: 走査前に取得した os.stat_result
+            text_offset: 最新 assistant テキストのオフセット（なければ NO_OFFSET）
+            report_offset: SOR/EOR ブロック先頭のオフセット（なければ NO_OFFSET）
+        """
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sessions (path, size, mtime_ns, text_offset, report_offset)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (str(path), stat.st_size, stat.st_mtime_ns, text_offset, report_offset)
+            )
+            self.conn.commit()
+
+    def close(self):
+        """接続を閉じる"""
+        with self.lock:
+            self.conn.close()
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_session_index():
+    """
+    既定のインデックス（SETTINGS_DIR 内）を取得
+
+    Returns:
+        SessionIndex: インデックス（開けなかった場合は None）
+    """
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            try:
+                _default_index = SessionIndex(INDEX_FILE)
+            except sqlite3.Error as e:
+                print(f"[DEBUG] Failed to open session index: {e}")
+                return None
+        return _default_index
@@ -49,6 +49,14 @@ class Settings:
         self.cc_prefix = DEFAULT_CC_PREFIX
         self.mini_window_position = "cli_bottom_left"
         self.first_run = "1"
+        self.report_prefetch = "0"  # 1 でCC報告をバックグラウンドで先読み
+        self.report_search = "recent"  # full でセッション全体から SOR/EOR を探す
+        self.report_projects = []  # 複数プロジェクト一覧に表示するプロジェクトパス
+        self.report_format = "ansi"  # CC報告の整形ステージ（カンマ区切り、空なら整形しない）
+        self.report_token_budget = "0"  # 1以上ならCC報告をこのトークン数に収める
+        self.report_tokenizer_file = ""  # トークン数見積もりの補正に使うトークナイザファイル
+        self.report_delta = "0"  # 1 で前回のCC報告からの差分だけをコピー
+        self.history_backend = "json"  # sqlite で件数の上限なし・全文検索できる履歴
         self.debug_mode = "0"  # 隠し機能: F_DebugMode=1 でコンソール表示
         self.load()
 
@@ -94,6 +102,23 @@ class Settings:
                         self.mini_window_position = value
                     elif key == 'first_run':
                         self.first_run = value
+                    elif key == 'report_prefetch':
+                        self.report_prefetch = value
+                    elif key == 'report_search':
+                        self.report_search = value if value in ("recent", "full") else "recent"
+                    elif key == 'report_projects':
+                        # Windows のパスに使えない '|' で区切って保存している
+                        self.report_projects = [p for p in value.split('|') if p]
+                    elif key == 'report_format':
+                        self.report_format = value
+                    elif key == 'report_token_budget':
+                        self.report_token_budget = value if value.isdigit() else "0"
+                    elif key == 'report_tokenizer_file':
+                        self.report_tokenizer_file = value
+                    elif key == 'report_delta':
+                        self.report_delta = value
+                    elif key == 'history_backend':
+                        self.history_backend = value if value in ("json", "sqlite") else "json"
                     elif key == 'F_DebugMode':
                         self.debug_mode = value
 
@@ -117,5 +142,13 @@ class Settings:
                 f.write(f"cc_prefix={self.cc_prefix.replace(chr(10), '\\n')}\n")
                 f.write(f"mini_window_position={self.mini_window_position}\n")
                 f.write(f"first_run={self.first_run}\n")
+                f.write(f"report_prefetch={self.report_prefetch}\n")
+                f.write(f"report_search={self.report_search}\n")
+                f.write(f"report_projects={'|'.join(self.report_projects)}\n")
+                f.write(f"report_format={self.report_format}\n")
+                f.write(f"report_token_budget={self.report_token_budget}\n")
+                f.write(f"report_tokenizer_file={self.report_tokenizer_file}\n")
+                f.write(f"report_delta={self.report_delta}\n")
+                f.write(f"history_backend={self.history_backend}\n")
         except Exception as e:
             print(f"[DEBUG] Failed to save settings: {e}")
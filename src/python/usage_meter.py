@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - Claude Code のトークン使用量
+
+assistant の各エントリに書かれる message.usage を集計し、セッションごと・プロジェクトごとの
+入力・出力・キャッシュのトークン数を返す。CC報告の読み取りと同じく解析済みのバイト位置を
+カーソルとして保持し、2回目以降は追記された行だけを解析する。
+
+Claude Code は1つの応答を content ブロックごとに複数行へ分けて書き、各行に同じ
+message.id と（途中までの）usage を付ける。同じ id が続いた場合は最後の行の値で置き換える。
+"""
+
+import os
+import threading
+from pathlib import Path
+
+from cc_report import (
+    get_log_dir, iter_session_logs_by_mtime, ReportCancelled, raise_if_cancelled, cancellation,
+    decode_json, ASSISTANT_TYPE_PATTERNS, CURSOR_SIGNATURE_LENGTH
+)
+from io_utils import iter_lines_from, read_signature, FileCursor
+
+# 集計するフィールド（message.usage のキー）
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+# usage を含みうる行を見分けるためのバイト列（デコード前の絞り込み用）
+USAGE_PATTERNS = (b'"usage":', b'"usage" :')
+
+# カーソルの保持上限（超えたら古いものから破棄）
+MAX_USAGE_CURSORS = 256
+
+# セッションログごとの集計カーソル（パス文字列 → _UsageCursor）
+_usage_cursors = {}
+_usage_lock = threading.Lock()
+
+
+class UsageTotals:
+    """トークン使用量の合計"""
+
+    __slots__ = USAGE_FIELDS + ("messages",)
+
+    def __init__(self):
+        for field in self.__slots__:
+            setattr(self, field, 0)
+
+    def add(self, values, sign=1):
+        """USAGE_FIELDS 順の値のタプルを足す（sign=-1 で引く）"""
+        for field, value in zip(USAGE_FIELDS, values):
+            setattr(self, field, getattr(self, field) + sign * value)
+
+    def merge(self, other):
+        """別の合計を足す"""
+        for field in self.__slots__:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    def copy(self):
+        totals = UsageTotals()
+        totals.merge(self)
+        return totals
+
+    @property
+    def total_tokens(self):
+        """入力・出力・キャッシュをすべて足したトークン数"""
+        return sum(getattr(self, field) for field in USAGE_FIELDS)
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.__slots__}
+        data["total_tokens"] = self.total_tokens
+        return data
+
+
+class _UsageCursor(FileCursor):
+    """セッションログの集計状態"""
+
+    def __init__(self, stat):
+        super().__init__(stat)
+        self.totals = UsageTotals()
+        self.last_message_id = None   # 直前に集計した応答の message.id
+        self.last_values = None       # その usage（同じ id の行が続いたら差し替える）
+
+
+def _parse_usage(line):
+    """
+    JSONL の1行から assistant の usage を取り出す
+
+    Returns:
+        tuple: (message.id, USAGE_FIELDS 順の値のタプル)（usage のない行は None）
+    """
+    if not any(p in line for p in USAGE_PATTERNS) or not any(p in line for p in ASSISTANT_TYPE_PATTERNS):
+        return None
+    try:
+        entry = decode_json(line)
+    except ValueError:
+        return None
+    if not isinstance(entry, dict) or entry.get("type") != "assistant":
+        return None
+    message = entry.get("message")
+    usage = message.get("usage") if isinstance(message, dict) else None
+    if not isinstance(usage, dict):
+        return None
+
+    values = []
+    for field in USAGE_FIELDS:
+        value = usage.get(field)
+        values.append(value if isinstance(value, int) else 0)
+    return message.get("id") or entry.get("uuid"), tuple(values)
+
+
+def _read_signature(jsonl_path, offset):
+    """解析済み位置の直前にあるバイト列を読む"""
+    return read_signature(jsonl_path, offset, CURSOR_SIGNATURE_LENGTH)
+
+
+def _advance_usage(jsonl_path, cursor):
+    """解析済み位置以降に追記された行だけを集計してカーソルを進める"""
+    for offset, line, terminated in iter_lines_from(jsonl_path, cursor.offset):
+        raise_if_cancelled()
+        # 書き込み途中の末尾行は解析済みにしない（次回、完成してから読む）
+        if not terminated:
+            break
+
+        parsed = _parse_usage(line)
+        if parsed is not None:
+            message_id, values = parsed
+            if message_id is not None and message_id == cursor.last_message_id:
+                cursor.totals.add(cursor.last_values, -1)
+            else:
+                cursor.totals.messages += 1
+            cursor.totals.add(values)
+            cursor.last_message_id = message_id
+            cursor.last_values = values
+        cursor.offset = offset + len(line) + 1
+
+
+def get_session_usage(jsonl_path, cancel_event=None):
+    """
+    セッションログのトークン使用量を取得
+
+    ファイルが縮んだ・置き換えられた場合はカーソルを破棄して先頭から集計し直す。
+
+    Args:
+        jsonl_path: .jsonl ファイルのパス
+        cancel_event: threading.Event（セットされると ReportCancelled を送出して中断する）
+
+    Returns:
+        UsageTotals: 使用量の合計（コピー）
+    """
+    key = str(jsonl_path)
+    stat = os.stat(jsonl_path)
+
+    # cc_report と同じく、lock はカーソルの出し入れだけに使う
+    with _usage_lock:
+        cursor = _usage_cursors.pop(key, None)
+    if cursor is not None and not cursor.is_same_file(stat):
+        cursor = None
+    if (cursor is not None and not cursor.is_unchanged(stat)
+            and _read_signature(jsonl_path, cursor.offset) != cursor.signature):
+        cursor = None
+
+    if cursor is None:
+        cursor = _UsageCursor(stat)
+    if cursor.offset == 0 or not cursor.is_unchanged(stat):
+        try:
+            with cancellation(cancel_event):
+                _advance_usage(jsonl_path, cursor)
+        except ReportCancelled:
+            # 途中まで進めたカーソルも有効なので残しておく
+            _store_cursor(jsonl_path, key, cursor, stat)
+            raise
+    _store_cursor(jsonl_path, key, cursor, stat)
+    return cursor.totals.copy()
+
+
+def _store_cursor(jsonl_path, key, cursor, stat):
+    """カーソルを保存（最近使ったものを末尾に置き直し、上限を超えたら古いものから破棄）"""
+    cursor.size = stat.st_size
+    cursor.mtime_ns = stat.st_mtime_ns
+    cursor.signature = _read_signature(jsonl_path, cursor.offset)
+    with _usage_lock:
+        _usage_cursors[key] = cursor
+        while len(_usage_cursors) > MAX_USAGE_CURSORS:
+            del _usage_cursors[next(iter(_usage_cursors))]
+
+
+def get_project_usage(project_path, cancel_event=None):
+    """
+    プロジェクトのトークン使用量を、全セッションの合計と最新セッションについて取得
+
+    Args:
+        project_path: プロジェクトパス
+        cancel_event: threading.Event（ReportExecutor から呼ぶ場合に渡される）
+
+    Returns:
+        tuple: (プロジェクト合計の UsageTotals, 最新セッションの UsageTotals or None,
+                [(セッションログの Path, UsageTotals), ...]（新しい順）)
+    """
+    project_totals = UsageTotals()
+    sessions = []
+    for jsonl_path in iter_session_logs_by_mtime(get_log_dir(project_path)):
+        try:
+            totals = get_session_usage(jsonl_path, cancel_event)
+        except OSError as e:
+            print(f"[DEBUG] Usage scan failed for {Path(jsonl_path).name}: {e}")
+            continue
+        project_totals.merge(totals)
+        sessions.append((jsonl_path, totals))
+    return project_totals, (sessions[0][1] if sessions else None), sessions
+
+
+def clear_usage_cursors():
+    """集計カーソルをすべて破棄する（テスト・ベンチマーク用）"""
+    with _usage_lock:
+        _usage_cursors.clear()
+
+
+def format_token_count(count):
+    """トークン数を 12.3k / 4.56M のように短く表す"""
+    if count < 1000:
+        return str(count)
+    if count < 1_000_000:
+        return f"{count / 1000:.1f}k"
+    return f"{count / 1_000_000:.2f}M"
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Bridgiron - N件前の報告取得と全件走査の一致テスト
+
+1つのメッセージに SOR/EOR が複数ある場合でも、get_previous_report(back=N) が
+iter_session_reports の新しい方から N 件目と同じ報告を返すことを確かめる。
+
+実行方法:
+    python -m unittest discover -s tests
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src" / "python"
+sys.path.insert(0, str(SRC_DIR))
+
+import cc_report  # noqa: E402
+
+
+def _assistant_line(index, text):
+    entry = {
+        "type": "assistant",
+        "sessionId": "session",
+        "uuid": f"uuid-{index}",
+        "parentUuid": f"uuid-{index - 1}" if index else None,
+        "timestamp": f"2026-01-01T00:00:{index:02d}.000Z",
+        "message": {"role": "assistant", "content": [{"type": "text", "text": text}]},
+    }
+    return json.dumps(entry, ensure_ascii=False) + "\n"
+
+
+class ReportSpansTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _write_log(self, name, texts):
+        path = Path(self.tmp.name) / f"{name}.jsonl"
+        with open(path, "w", encoding="utf-8") as f:
+            for i, text in enumerate(texts):
+                f.write(_assistant_line(i, text))
+        return path
+
+    def _assert_matches_stream(self, path, expected):
+        reports = [report for _, _, report in cc_report.iter_session_reports(path)]
+        self.assertEqual(reports, expected)
+        newest_first = list(reversed(reports))
+        for back, report in enumerate(newest_first):
+            self.assertEqual(cc_report.get_previous_report(path, back), report)
+        self.assertIsNone(cc_report.get_previous_report(path, len(newest_first)))
+
+    def test_two_reports_in_one_message(self):
+        path = self._write_log("two_in_one", [
+            "---SOR---\nOld report\n---EOR---",
+            "ok",
+            "---SOR---\nReport one\n---EOR---\nbetween\n---SOR---\nReport two\n---EOR---",
+        ])
+        self._assert_matches_stream(path, ["Old report", "Report one", "Report two"])
+
+    def test_eor_then_sor_in_one_message(self):
+        path = self._write_log("eor_then_sor", [
+            "---SOR---\nA",
+            "x ---EOR--- y ---SOR--- z",
+            "B ---EOR---",
+        ])
+        self._assert_matches_stream(path, ["A\nx", "z\nB"])
+
+    def test_eor_then_sor_starts_span(self):
+        path = self._write_log("eor_then_sor_start", [
+            "x ---EOR--- y ---SOR--- z",
+            "B ---EOR---",
+        ])
+        self._assert_matches_stream(path, ["z\nB"])
+
+    def test_sor_restarts_report(self):
+        path = self._write_log("restart", [
+            "---SOR---\nabandoned",
+            "---SOR---\nkept",
+            "tail ---EOR--- ---EOR---",
+        ])
+        self._assert_matches_stream(path, ["kept\ntail"])
+
+
+if __name__ == "__main__":
+    unittest.main()